@@ -1,13 +1,148 @@
+import asyncio
 import gradio as gr
+import hashlib
 import os
-from retirement_calculator import UserProfile, RetirementCalculator
-from report_generator import ReportGenerator
+import re
+import shutil
+import string
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
 
-# Initialize report generator with Gemini API key
-GEMINI_API_KEY = ""
-report_generator = ReportGenerator(api_key=GEMINI_API_KEY)
+# The report generator pulls in ReportLab, so it and the calculator are imported on
+# first use to keep `import app` light
+_DEPS = {}
 
-def create_retirement_profile(
+def _load_deps():
+    if not _DEPS:
+        from retirement_calculator import UserProfile, RetirementCalculator
+        from report_generator import ReportGenerator, render_pdf_report, canonical_json
+        _DEPS.update(
+            UserProfile=UserProfile,
+            RetirementCalculator=RetirementCalculator,
+            # Gemini API key is read from the GEMINI_API_KEY environment variable
+            report_generator=ReportGenerator(),
+            render_pdf_report=render_pdf_report,
+            # Sorted-key JSON bytes, so equal results always hash the same
+            canonical_json=canonical_json
+        )
+    return _DEPS
+
+# ReportLab builds are CPU-bound, so render PDFs in worker processes instead of threads
+_PDF_WORKERS = os.cpu_count() or 1
+_PDF_POOL = ProcessPoolExecutor(max_workers=_PDF_WORKERS)
+
+# Created once at import rather than on every submission
+_REPORTS_DIR = os.path.abspath("reports")
+os.makedirs(_REPORTS_DIR, exist_ok=True)
+
+# Content-addressed store: each distinct report is built once, and per-user download
+# names are hard links to its blob
+_REPORT_BLOBS_DIR = os.path.join(_REPORTS_DIR, "_blobs")
+os.makedirs(_REPORT_BLOBS_DIR, exist_ok=True)
+
+# Blobs this young are never pruned, so a fresh build is always linked before it can go
+_BLOB_MIN_AGE_SECONDS = 600
+
+# How often the background sweep looks for blobs no download name links to
+_BLOB_PRUNE_INTERVAL_SECONDS = 300
+
+def _report_cache_key(results):
+    """Hash everything a report is built from"""
+    return hashlib.blake2b(_load_deps()['canonical_json'](results), digest_size=12).hexdigest()
+
+async def _render_report_blob(render, results, blob_path):
+    """Build the report into blob_path unless an identical one is already stored"""
+    if not os.path.exists(blob_path):
+        tmp_path = f"{blob_path}.{uuid.uuid4().hex}.tmp"
+        await asyncio.get_running_loop().run_in_executor(_PDF_POOL, render, results, None, tmp_path)
+        os.replace(tmp_path, blob_path)
+
+def _link_report(blob_path, report_path):
+    """Atomically point report_path at blob_path without copying its bytes"""
+    # A repeat of the same report is already linked under this name
+    if os.path.exists(report_path) and os.path.samefile(blob_path, report_path):
+        return
+    tmp_path = f"{report_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(blob_path, tmp_path)
+    except OSError:
+        # Filesystems without hard links get a plain copy
+        shutil.copyfile(blob_path, tmp_path)
+    try:
+        os.replace(tmp_path, report_path)
+    finally:
+        # rename does nothing when both names already link to the same file
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _prune_report_blobs():
+    """Delete blobs that no download name links to any more"""
+    cutoff = time.time() - _BLOB_MIN_AGE_SECONDS
+    for entry in os.scandir(_REPORT_BLOBS_DIR):
+        try:
+            stat = entry.stat()
+            if entry.is_file() and stat.st_nlink <= 1 and stat.st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            # Replaced or removed by a concurrent render while the sweep ran
+            continue
+
+def _prune_report_blobs_forever():
+    """Sweep orphaned blobs for the life of the process; overwritten downloads orphan one each"""
+    while True:
+        _prune_report_blobs()
+        time.sleep(_BLOB_PRUNE_INTERVAL_SECONDS)
+
+# (profile field, type, default when the form leaves it empty), in handler argument order
+_NUMERIC_FIELDS = (
+    ('age', int, 0),
+    ('work_experience', int, 0),
+    ('current_savings', float, 0.0),
+    ('monthly_income', float, 0.0),
+    ('monthly_expenses', float, 0.0),
+    ('debts', float, 0.0),
+)
+
+# Comma plus any surrounding whitespace, so one split yields already-stripped items
+_LIST_SEPARATOR_RE = re.compile(r"\s*,\s*")
+
+def _split_list(text):
+    return list(filter(None, _LIST_SEPARATOR_RE.split(text.strip()))) if text else []
+
+_OUTPUT_TEMPLATE = string.Template("""
+        📊 Retirement Analysis Results:
+        🎯 Recommended Retirement Age: $retirement_age years
+        📈 Estimated Life Expectancy: $life_expectancy years
+        💰 Financial Readiness Ratio: $financial_ratio
+        📋 Scenario: $scenario
+        Financial Details:
+        - Total Retirement Savings: $$$total_retirement_savings
+        - Required Savings: $$$required_savings
+        - Annual Retirement Expenses: $$$annual_retirement_expenses
+        - Expected Retirement Duration: $retirement_duration years
+        📝 AI-Powered Insights:
+        $analysis
+        $report_status
+        """)
+
+def _format_output(results, analysis, report_status):
+    metrics = results['financial_metrics']
+    return _OUTPUT_TEMPLATE.substitute(
+        retirement_age=results['recommended_retirement_age'],
+        life_expectancy=f"{results['life_expectancy']:.1f}",
+        financial_ratio=f"{results['financial_ratio']:.2f}",
+        scenario=results['scenario'].title(),
+        total_retirement_savings=f"{metrics['total_retirement_savings']:,.2f}",
+        required_savings=f"{metrics['required_savings']:,.2f}",
+        annual_retirement_expenses=f"{metrics['annual_retirement_expenses']:,.2f}",
+        retirement_duration=f"{metrics['retirement_duration']:.1f}",
+        analysis=analysis,
+        report_status=report_status
+    )
+
+async def create_retirement_profile(
     age,
     gender,
     marital_status,
@@ -25,24 +160,31 @@ def create_retirement_profile(
     healthy_diet
 ):
     try:
+        deps = _load_deps()
+        report_generator = deps['report_generator']
+        
         # Validate required inputs
         if not gender:
-            return "Error: Please select a gender.", None
+            yield "Error: Please select a gender.", None
+            return
         if not marital_status:
-            return "Error: Please select a marital status.", None
+            yield "Error: Please select a marital status.", None
+            return
         if not education_level:
-            return "Error: Please select an education level.", None
+            yield "Error: Please select an education level.", None
+            return
             
         # Convert inputs to appropriate types and handle None values
-        age = int(age) if age is not None else 0
-        work_experience = int(work_experience) if work_experience is not None else 0
-        current_savings = float(current_savings) if current_savings is not None else 0.0
-        monthly_income = float(monthly_income) if monthly_income is not None else 0.0
-        monthly_expenses = float(monthly_expenses) if monthly_expenses is not None else 0.0
-        debts = float(debts) if debts is not None else 0.0
+        numeric_fields = {
+            name: default if value is None else cast(value)
+            for (name, cast, default), value in zip(
+                _NUMERIC_FIELDS,
+                (age, work_experience, current_savings, monthly_income, monthly_expenses, debts)
+            )
+        }
         
-        health_conditions_list = [condition.strip() for condition in health_conditions.split(",") if condition.strip()] if health_conditions else []
-        family_health_history_list = [condition.strip() for condition in family_health_history.split(",") if condition.strip()] if family_health_history else []
+        health_conditions_list = _split_list(health_conditions)
+        family_health_history_list = _split_list(family_health_history)
         
         lifestyle_factors = {
             "smoking": bool(smoking),
@@ -50,49 +192,43 @@ def create_retirement_profile(
             "healthy_diet": bool(healthy_diet)
         }
         
-        profile = UserProfile(
-            age=age,
+        profile = deps['UserProfile'](
             gender=gender,
             marital_status=marital_status,
             occupation=occupation or "Not specified",
-            work_experience=work_experience,
             education_level=education_level,
-            current_savings=current_savings,
-            monthly_income=monthly_income,
-            monthly_expenses=monthly_expenses,
-            debts=debts,
             health_conditions=health_conditions_list,
             family_health_history=family_health_history_list,
-            lifestyle_factors=lifestyle_factors
+            lifestyle_factors=lifestyle_factors,
+            **numeric_fields
         )
         
-        calculator = RetirementCalculator()
+        calculator = deps['RetirementCalculator']()
         results = calculator.recommend_retirement_age(profile)
-        llm_insights = report_generator.generate_llm_insights(results)
+        # Settle the report metrics up front so streamed updates show final numbers
+        report_generator.apply_retirement_metrics(results)
         
         report_filename = f"retirement_report_{profile.age}_{profile.gender.lower()}.pdf"
-        report_path = os.path.join("reports", report_filename)
-        os.makedirs("reports", exist_ok=True)
-        report_generator.create_pdf_report(results, llm_insights, report_path)
+        report_path = os.path.join(_REPORTS_DIR, report_filename)
         
-        output = f"""
-        📊 Retirement Analysis Results:
-        🎯 Recommended Retirement Age: {results['recommended_retirement_age']} years
-        📈 Estimated Life Expectancy: {results['life_expectancy']:.1f} years
-        💰 Financial Readiness Ratio: {results['financial_ratio']:.2f}
-        📋 Scenario: {results['scenario'].title()}
-        Financial Details:
-        - Total Retirement Savings: ${results['financial_metrics']['total_retirement_savings']:,.2f}
-        - Required Savings: ${results['financial_metrics']['required_savings']:,.2f}
-        - Annual Retirement Expenses: ${results['financial_metrics']['annual_retirement_expenses']:,.2f}
-        - Expected Retirement Duration: {results['financial_metrics']['retirement_duration']:.1f} years
-        📝 AI-Powered Insights:
-        {llm_insights['analysis']}
-        📄 A detailed PDF report has been generated: {report_filename}
-        """
-        return output, report_path
+        # Build each distinct report once; identical submissions from any user reuse its blob.
+        # The PDF does not include the analysis text, so it renders while Gemini streams.
+        blob_path = os.path.join(_REPORT_BLOBS_DIR, f"{_report_cache_key(results)}.pdf")
+        report_task = asyncio.ensure_future(_render_report_blob(deps['render_pdf_report'], results, blob_path))
+        
+        async for llm_insights in report_generator.stream_llm_insights(results):
+            yield _format_output(results, llm_insights['analysis'], "⏳ Preparing your PDF report..."), None
+        
+        await report_task
+        try:
+            _link_report(blob_path, report_path)
+        except FileNotFoundError:
+            # The sweep removed an old orphan blob between the existence check and the link
+            await _render_report_blob(deps['render_pdf_report'], results, blob_path)
+            _link_report(blob_path, report_path)
+        yield _format_output(results, llm_insights['analysis'], f"📄 A detailed PDF report has been generated: {report_filename}"), report_path
     except Exception as e:
-        return f"An error occurred: {str(e)}", None
+        yield f"An error occurred: {str(e)}", None
 
 demo = gr.Interface(
     fn=create_retirement_profile,
@@ -131,5 +267,31 @@ demo = gr.Interface(
     theme=gr.themes.Soft()
 )
 
+def _warmup():
+    """Pay every first-request cost before the UI accepts traffic"""
+    # Import everything up front so the PDF workers inherit it
+    deps = _load_deps()
+    deps['RetirementCalculator']().recommend_retirement_age(deps['UserProfile'](
+        age=40,
+        gender="Female",
+        marital_status="Single",
+        occupation="Not specified",
+        work_experience=15,
+        education_level="Bachelor's",
+        current_savings=50000.0,
+        monthly_income=5000.0,
+        monthly_expenses=3000.0,
+        debts=0.0,
+        health_conditions=[],
+        family_health_history=[],
+        lifestyle_factors={"smoking": False, "regular_exercise": True, "healthy_diet": True}
+    ))
+    deps['report_generator'].warmup()
+    # Start every worker before Gradio spins up its threads
+    wait([_PDF_POOL.submit(os.getpid) for _ in range(_PDF_WORKERS)])
+
 if __name__ == "__main__":
+    _warmup()
+    threading.Thread(target=_prune_report_blobs_forever, daemon=True).start()
+    demo.queue(default_concurrency_limit=16)
     demo.launch(share=True) 
@@ -1,13 +1,200 @@
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+import copy
+import threading
+
+# Styles and the static flowables around the comparison table are built once per process
+# and reused. ReportLab itself is imported on first use so importing this module stays cheap.
+_STYLES_INITIALIZED = False
+_STYLES = {}
+_STATIC_FLOWABLES = []
+_CLOSING_FLOWABLES = []
+_INIT_LOCK = threading.Lock()
+
+def _init_styles():
+    global _STYLES, _STATIC_FLOWABLES, _CLOSING_FLOWABLES, _STYLES_INITIALIZED
+    if _STYLES_INITIALIZED:
+        return
+    with _INIT_LOCK:
+        if _STYLES_INITIALIZED:
+            return
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import Paragraph, Spacer, TableStyle
+
+        styles = getSampleStyleSheet()
+        built_styles = {}
+        static_flowables = []
+        closing_flowables = []
+
+        # Custom styles
+        built_styles['title'] = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#2C3E50')
+        )
+
+        built_styles['subtitle'] = ParagraphStyle(
+            'Subtitle',
+            parent=styles['Normal'],
+            fontSize=14,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#34495E')
+        )
+
+        built_styles['section_title'] = ParagraphStyle(
+            'SectionTitle',
+            parent=styles['Heading2'],
+            fontSize=18,
+            spaceBefore=20,
+            spaceAfter=15,
+            textColor=colors.HexColor('#2C3E50')
+        )
+
+        built_styles['body'] = ParagraphStyle(
+            'Body',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=12,
+            textColor=colors.HexColor('#34495E'),
+            alignment=TA_JUSTIFY
+        )
+
+        built_styles['notes'] = ParagraphStyle(
+            'Notes',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceBefore=5,
+            spaceAfter=5,
+            textColor=colors.HexColor('#34495E'),
+            bulletIndent=20
+        )
+
+        built_styles['disclaimer'] = ParagraphStyle(
+            'Disclaimer',
+            parent=styles['Normal'],
+            fontSize=9,
+            spaceBefore=20,
+            textColor=colors.HexColor('#7F8C8D'),
+            alignment=TA_CENTER
+        )
+
+        # Enhanced table style
+        built_styles['table'] = TableStyle([
+            # Header styling
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('TOPPADDING', (0, 0), (-1, 0), 12),
+        
+            # Body styling
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#2C3E50')),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+        
+            # Alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9F9')]),
+        ])
+
+        title_style = built_styles['title']
+        subtitle_style = built_styles['subtitle']
+        section_title_style = built_styles['section_title']
+        body_style = built_styles['body']
+
+        # Add main title and subtitle
+        static_flowables.append(Paragraph("Retirement Planning Analysis Report", title_style))
+        static_flowables.append(Paragraph(
+            "A comprehensive analysis of retirement planning strategies and considerations",
+            subtitle_style
+        ))
+        static_flowables.append(Spacer(1, 20))
+
+        # Add introduction
+        static_flowables.append(Paragraph("Introduction", section_title_style))
+        intro_text = """
+        This report provides a comprehensive analysis of retirement planning strategies, focusing on different retirement age scenarios and their implications. 
+        The analysis takes into account various factors including savings requirements, investment strategies, and lifestyle considerations.
+        """
+        static_flowables.append(Paragraph(intro_text, body_style))
+        static_flowables.append(Spacer(1, 20))
+
+        # Add Retirement Age Comparison section
+        static_flowables.append(Paragraph("Retirement Age Comparison Analysis", section_title_style))
+        static_flowables.append(Paragraph(
+            "The following table illustrates different retirement age scenarios and their key considerations:",
+            body_style
+        ))
+        static_flowables.append(Spacer(1, 10))
+
+        # Add analysis section
+        closing_flowables.append(Spacer(1, 20))
+        closing_flowables.append(Paragraph("Analysis and Recommendations", section_title_style))
+        analysis_text = """
+        Based on the retirement age comparison analysis, several key insights emerge:
+
+        1. Early Retirement (Age 60):
+           • Requires the most aggressive saving strategy
+           • Offers longest retirement period but highest financial pressure
+           • Suitable for those with high income and strong investment portfolio
+
+        2. Standard Retirement (Age 65):
+           • Provides a balanced approach to retirement planning
+           • Allows for moderate saving rates and investment strategies
+           • Most common retirement age with established benefits
+
+        3. Late Retirement (Age 70-75):
+           • Offers more time for wealth accumulation
+           • May provide higher social security benefits
+           • Requires consideration of health and work capacity
+        """
+        closing_flowables.append(Paragraph(analysis_text, body_style))
+
+        # Add notes section with improved styling
+        closing_flowables.append(Spacer(1, 20))
+        closing_flowables.append(Paragraph("Important Considerations", section_title_style))
+    
+        notes = [
+            "• This analysis provides illustrative examples and general concepts for retirement planning",
+            "• Actual savings needed will depend on individual circumstances, income, and lifestyle goals",
+            "• Life expectancy is assumed to be 85 years for calculation purposes",
+            "• Investment returns and inflation are not factored into these calculations",
+            "• Social security benefits and other retirement income sources should be considered",
+            "• Regular review and adjustment of retirement plans is recommended"
+        ]
+    
+        for note in notes:
+            closing_flowables.append(Paragraph(note, built_styles['notes']))
+
+        # Add disclaimer
+        closing_flowables.append(Spacer(1, 20))
+        closing_flowables.append(Paragraph(
+            "This report is for informational purposes only and should not be considered as financial advice. Please consult with a financial advisor for personalized retirement planning.",
+            built_styles['disclaimer']
+        ))
+
+        # Built into locals and published together, so no caller ever sees partial lists
+        _STYLES, _STATIC_FLOWABLES, _CLOSING_FLOWABLES = built_styles, static_flowables, closing_flowables
+        _STYLES_INITIALIZED = True
 
 def create_retirement_report():
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table
+
     # Create the PDF document
     doc = SimpleDocTemplate(
         "retirement_analysis_report.pdf",
@@ -15,72 +202,13 @@ def create_retirement_report():
         rightMargin=30,
         leftMargin=30,
         topMargin=30,
-        bottomMargin=30
-    )
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#2C3E50')
-    )
-
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontSize=14,
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#34495E')
-    )
-
-    section_title_style = ParagraphStyle(
-        'SectionTitle',
-        parent=styles['Heading2'],
-        fontSize=18,
-        spaceBefore=20,
-        spaceAfter=15,
-        textColor=colors.HexColor('#2C3E50')
-    )
-
-    body_style = ParagraphStyle(
-        'Body',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceAfter=12,
-        textColor=colors.HexColor('#34495E'),
-        alignment=TA_JUSTIFY
+        bottomMargin=30,
+        pageCompression=1  # zlib-compress page content streams
     )
+    _init_styles()
 
-    # Add main title and subtitle
-    elements.append(Paragraph("Retirement Planning Analysis Report", title_style))
-    elements.append(Paragraph(
-        "A comprehensive analysis of retirement planning strategies and considerations",
-        subtitle_style
-    ))
-    elements.append(Spacer(1, 20))
-
-    # Add introduction
-    elements.append(Paragraph("Introduction", section_title_style))
-    intro_text = """
-    This report provides a comprehensive analysis of retirement planning strategies, focusing on different retirement age scenarios and their implications. 
-    The analysis takes into account various factors including savings requirements, investment strategies, and lifestyle considerations.
-    """
-    elements.append(Paragraph(intro_text, body_style))
-    elements.append(Spacer(1, 20))
-
-    # Add Retirement Age Comparison section
-    elements.append(Paragraph("Retirement Age Comparison Analysis", section_title_style))
-    elements.append(Paragraph(
-        "The following table illustrates different retirement age scenarios and their key considerations:",
-        body_style
-    ))
-    elements.append(Spacer(1, 10))
+    # Flowables are shallow-copied so concurrent builds never share layout state
+    elements = [copy.copy(flowable) for flowable in _STATIC_FLOWABLES]
 
     # Table data with improved formatting
     data = [
@@ -97,99 +225,10 @@ def create_retirement_report():
 
     # Create table with adjusted column widths
     table = Table(data, colWidths=[1.2*inch, 1.5*inch, 1.5*inch, 1.5*inch, 3*inch])
-    
-    # Enhanced table style
-    table_style = TableStyle([
-        # Header styling
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        
-        # Body styling
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#2C3E50')),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('LEFTPADDING', (0, 0), (-1, -1), 10),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-        
-        # Alternating row colors
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9F9')]),
-    ])
-    table.setStyle(table_style)
+    table.setStyle(_STYLES['table'])
     elements.append(table)
 
-    # Add analysis section
-    elements.append(Spacer(1, 20))
-    elements.append(Paragraph("Analysis and Recommendations", section_title_style))
-    analysis_text = """
-    Based on the retirement age comparison analysis, several key insights emerge:
-
-    1. Early Retirement (Age 60):
-       • Requires the most aggressive saving strategy
-       • Offers longest retirement period but highest financial pressure
-       • Suitable for those with high income and strong investment portfolio
-
-    2. Standard Retirement (Age 65):
-       • Provides a balanced approach to retirement planning
-       • Allows for moderate saving rates and investment strategies
-       • Most common retirement age with established benefits
-
-    3. Late Retirement (Age 70-75):
-       • Offers more time for wealth accumulation
-       • May provide higher social security benefits
-       • Requires consideration of health and work capacity
-    """
-    elements.append(Paragraph(analysis_text, body_style))
-
-    # Add notes section with improved styling
-    elements.append(Spacer(1, 20))
-    elements.append(Paragraph("Important Considerations", section_title_style))
-    notes_style = ParagraphStyle(
-        'Notes',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceBefore=5,
-        spaceAfter=5,
-        textColor=colors.HexColor('#34495E'),
-        bulletIndent=20
-    )
-    
-    notes = [
-        "• This analysis provides illustrative examples and general concepts for retirement planning",
-        "• Actual savings needed will depend on individual circumstances, income, and lifestyle goals",
-        "• Life expectancy is assumed to be 85 years for calculation purposes",
-        "• Investment returns and inflation are not factored into these calculations",
-        "• Social security benefits and other retirement income sources should be considered",
-        "• Regular review and adjustment of retirement plans is recommended"
-    ]
-    
-    for note in notes:
-        elements.append(Paragraph(note, notes_style))
-
-    # Add disclaimer
-    disclaimer_style = ParagraphStyle(
-        'Disclaimer',
-        parent=styles['Normal'],
-        fontSize=9,
-        spaceBefore=20,
-        textColor=colors.HexColor('#7F8C8D'),
-        alignment=TA_CENTER
-    )
-    elements.append(Spacer(1, 20))
-    elements.append(Paragraph(
-        "This report is for informational purposes only and should not be considered as financial advice. Please consult with a financial advisor for personalized retirement planning.",
-        disclaimer_style
-    ))
+    elements.extend(copy.copy(flowable) for flowable in _CLOSING_FLOWABLES)
 
     # Build the PDF
     doc.build(elements)
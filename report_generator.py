@@ -1,5 +1,17 @@
-from google import genai
+import asyncio
+import atexit
+import copy
+import hashlib
+import io
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
 from datetime import datetime
+from typing import BinaryIO, Optional, Union
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -7,56 +19,455 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER
 
+# orjson encodes straight to bytes in native code; the stdlib module is the fallback
+# canonical_json (sorted keys, bytes) is public: app.py hashes it for report cache keys
+try:
+    import orjson
+
+    def _to_json(obj) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode()
+
+    def canonical_json(obj) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    import json
+
+    def _to_json(obj) -> str:
+        return json.dumps(obj, default=str, indent=2)
+
+    def canonical_json(obj) -> bytes:
+        return json.dumps(obj, default=str, sort_keys=True).encode()
+
+# Read once per process; see README for configuration
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
+
+# One Gemini client per API key per process, so every request reuses its connection pool.
+# The SDK is imported on first use, so PDF workers and math-only callers never load it.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _get_client(api_key: str):
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(api_key)
+            if client is None:
+                from google import genai
+                client = _CLIENTS[api_key] = genai.Client(api_key=api_key)
+    return client
+
+# Gemini insight cache: bounded LRU, persisted across restarts. The bound counts keys, and
+# each response is stored under two (exact and quantized), so this holds about 512 responses
+LLM_CACHE_SIZE = 1024
+LLM_CACHE_PATH = os.path.join("reports", "llm_cache.pkl")
+
+# Shared across all generators so concurrent sessions cannot exceed the Gemini quota
+LLM_MAX_CONCURRENCY = 5
+LLM_MAX_RETRIES = 6
+LLM_BACKOFF_SECONDS = 1
+_LLM_SEMAPHORE = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+# Fixed instructions sent as the system instruction, so every request shares the same
+# prefix and only the profile JSON varies
+_INSIGHTS_TASK = """Based on this data, generate a professional analysis including:
+- Life expectancy explanation
+- Financial sufficiency assessment
+- Scenario comparison table with different retirement ages
+- Highlighted recommendations for savings and retirement strategy
+- Risk factors with grounding"""
+INSIGHTS_SYSTEM_INSTRUCTION = (
+    "You are a financial planning assistant. The user message is the user profile data in JSON format.\n\n"
+    + _INSIGHTS_TASK
+)
+INSIGHTS_CONFIG = {"system_instruction": INSIGHTS_SYSTEM_INSTRUCTION}
+
+# Batches answer with a JSON array holding one analysis per profile, in input order
+LLM_BATCH_SIZE = 8
+INSIGHTS_BATCH_SYSTEM_INSTRUCTION = (
+    "You are a financial planning assistant. The user message is a JSON array of user profiles.\n\n"
+    + _INSIGHTS_TASK
+    + "\n\nWrite one analysis per profile and return them as a JSON array of strings, in the same order as the profiles."
+)
+INSIGHTS_BATCH_CONFIG = {
+    "system_instruction": INSIGHTS_BATCH_SYSTEM_INSTRUCTION,
+    "response_mime_type": "application/json",
+    "response_schema": list[str]
+}
+
+# Bucket sizes for numeric prompt fields in the quantized insights cache key: ages in
+# five-year bands, monthly cash flows in $1k, balances in $10k
+_INSIGHTS_KEY_BUCKETS = {
+    "age": 5,
+    "monthly_income": 1000,
+    "monthly_expenses": 1000,
+    "debt": 10000,
+    "assets": 10000,
+    "anual_working_hours": 100,
+}
+
+def _quantize_prompt_field(name: str, value):
+    """One prompt field as it appears in the quantized cache key."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(str(item).lower() for item in value))
+    step = _INSIGHTS_KEY_BUCKETS.get(name)
+    if step and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value // step)
+    return str(value).lower()
+
+def _require_analysis(text) -> str:
+    """Reject empty or blocked responses, so they surface as errors and are never cached."""
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("Gemini returned an empty analysis")
+    return text
+
+# WHO/CDC: https://www.who.int/news-room/fact-sheets/detail/healthy-diet
+_POSITIVE_HABITS = frozenset({'regular_exercise', 'healthy_diet', 'no_smoking', 'moderate_alcohol', 'stress_management'})
+
+# BLS: https://www.bls.gov/iif/oshwc/cfoi/cfoi_rates_2022hb.pdf
+_RISKY_JOBS = frozenset({'construction', 'mining', 'police', 'firefighter'})
+# Occupations are free text, so risky jobs are matched as substrings in a single scan
+_RISKY_JOBS_RE = re.compile('|'.join(sorted(_RISKY_JOBS)))
+
+# Pure in its arguments, so repeated calls for the same profile (sensitivity sweeps,
+# metrics plus report) are answered from the cache
+@lru_cache(maxsize=1024)
+def _life_expectancy(gender: str, health: tuple, habits: tuple, family: tuple,
+                     education: str, high_income: bool, occupation: str) -> float:
+    # SSA 2024: https://www.ssa.gov/oact/STATS/table4c6.html
+    base = 81.1 if gender == 'female' else 76.1  # SSA base life expectancy
+
+    # Health adjustment: Each chronic disease reduces by 3 years
+    health_adj = len(health) * -3
+
+    # Lifestyle adjustment: Each positive habit adds 2 years
+    lifestyle_adj = sum(1 for h in habits if h in _POSITIVE_HABITS) * 2
+
+    # Family health history: -4 for early death, +4 for long life
+    # SSA: https://www.ssa.gov/oact/STATS/table4c6.html
+    family_adj = -4 if 'early_death' in family else (4 if 'long_life' in family else 0)
+
+    # Education: +2 for university/graduate/phd
+    edu_adj = 2 if education in ['university', 'graduate', 'phd'] else 0
+
+    # Income: +2 if monthly income > 10000
+    income_adj = 2 if high_income else 0
+
+    # Occupation: -2 for risky jobs
+    job_adj = -2 if _RISKY_JOBS_RE.search(occupation) else 0
+
+    return base + health_adj + lifestyle_adj + family_adj + edu_adj + income_adj + job_adj
+
+def _profile_snapshot(profile) -> dict:
+    """Read a profile's fields into a plain dict once, so each later access is a dict lookup.
+    Accepts a UserProfile-style dataclass, any object with attributes, or an existing snapshot."""
+    if profile is None:
+        return {}
+    if isinstance(profile, dict):
+        return profile
+    if is_dataclass(profile):
+        return {field.name: getattr(profile, field.name) for field in fields(profile)}
+    return dict(vars(profile))
+
+# Rows of the report's profile table: (label, snapshot key, value kind)
+_PROFILE_FIELDS = (
+    ("Age", "age", None),
+    ("Gender", "gender", None),
+    ("Marital Status", "marital_status", None),
+    ("Occupation", "occupation", None),
+    ("Work Experience (years)", "work_experience", None),
+    ("Education Level", "education_level", None),
+    ("Current Savings ($)", "current_savings", "money"),
+    ("Monthly Income ($)", "monthly_income", "money"),
+    ("Monthly Expenses ($)", "monthly_expenses", "money"),
+    ("Total Debt ($)", "debt", "money"),
+    ("Chronic Diseases", "chronic_diseases", "list"),
+    ("Family Health History", "family_health_history", "list"),
+    ("Lifestyle Habits", "lifestyle_habits", "list"),
+)
+_PROFILE_FIELD_DEFAULTS = {None: 'N/A', "money": 0, "list": ()}
+
+def _format_profile_value(value, kind):
+    if kind == "money":
+        return f"${value:,.2f}"
+    if kind == "list":
+        return ", ".join(value) or "None"
+    return value
+
+# Static sources-and-methods section of every report
+GROUNDING_HTML = """
+        <b>Data Sources & Assumptions:</b><br/>
+        • <b>Life Expectancy:</b> Based on Social Security Administration (SSA) 2024 tables (<a href='https://www.ssa.gov/oact/STATS/table4c6.html'>link</a>), adjusted for gender, chronic diseases, lifestyle habits, family health history, education, income, and occupation.<br/>
+        • <b>Financial Calculations:</b> Assumes 3% annual inflation (<a href='https://www.bls.gov/cpi/'>BLS CPI</a>) and 5% annual investment return (<a href='https://investor.vanguard.com/investor-resources-education/article/investing-return-expectations'>Vanguard</a>), unless otherwise specified.<br/>
+        • <b>Social Security:</b> Estimated as 40% of current income, with an 8% increase per year after age 65 (<a href='https://www.ssa.gov/benefits/retirement/planner/ageincrease.html'>SSA</a>).<br/>
+        • <b>Healthy Habits:</b> Based on WHO and CDC recommendations (<a href='https://www.who.int/news-room/fact-sheets/detail/healthy-diet'>WHO</a>, <a href='https://www.cdc.gov/chronicdisease/resources/publications/aag/lifestyle.htm'>CDC</a>).<br/>
+        • <b>Risky Occupations:</b> Based on BLS fatality statistics (<a href='https://www.bls.gov/iif/oshwc/cfoi/cfoi_rates_2022hb.pdf'>BLS</a>).<br/>
+        <br/>
+        <b>Calculation Methods:</b><br/>
+        • <b>Life Expectancy:</b> SSA base + (-3 years per chronic disease) + (2 years per positive habit) + (family history, education, income, occupation adjustments).<br/>
+        • <b>Recommended Retirement Age:</b> 65 - (health, savings, income, lifestyle, education, family factors; see formula below).<br/>
+        • <b>Required Savings:</b> Present value of projected annual expenses during retirement, minus present value of social security benefits (<a href='https://www.investopedia.com/terms/p/present-value-annuity.asp'>Investopedia</a>).<br/>
+        <br/>
+        <b>User Inputs Used:</b><br/>
+        Age, gender, chronic diseases, lifestyle habits, family health history, education level, monthly income, monthly expenses, current savings, debt, occupation.<br/>
+        <br/>
+        <b>Key Formulas:</b><br/>
+        <b>Life Expectancy:</b> SSA base + (-3 × chronic diseases) + (2 × positive habits) + family/education/income/job adj.<br/>
+        <b>Retirement Age:</b> 65 - [health_factor × 7 + savings_factor × 4 + income_factor × 3 + lifestyle_factor × 3 + edu_factor × 2 + family_factor × 3]<br/>
+        <b>Required Savings:</b> PV of (annual expenses - social security) over retirement duration.<br/>
+        <br/>
+        <b>How Your Data Affects Results:</b><br/>
+        • <b>More chronic diseases</b> → lower life expectancy, later retirement age.<br/>
+        • <b>More positive habits</b> → higher life expectancy, earlier retirement age.<br/>
+        • <b>Higher income/savings</b> → earlier retirement possible.<br/>
+        • <b>Risky occupation/family history</b> → lower life expectancy.<br/>
+        <br/>
+        <b>References:</b><br/>
+        • <a href='https://www.ssa.gov/oact/STATS/table4c6.html'>SSA Life Table</a><br/>
+        • <a href='https://www.bls.gov/cpi/'>BLS CPI</a><br/>
+        • <a href='https://investor.vanguard.com/investor-resources-education/article/investing-return-expectations'>Vanguard Returns</a><br/>
+        • <a href='https://www.ssa.gov/benefits/retirement/planner/ageincrease.html'>SSA Retirement Planner</a><br/>
+        • <a href='https://www.ssa.gov/policy/docs/ssb/v75n4/v75n4p1.html'>SSA Replacement Rates</a><br/>
+        • <a href='https://www.who.int/news-room/fact-sheets/detail/healthy-diet'>WHO Healthy Diet</a><br/>
+        • <a href='https://www.cdc.gov/chronicdisease/resources/publications/aag/lifestyle.htm'>CDC Healthy Living</a><br/>
+        • <a href='https://www.bls.gov/iif/oshwc/cfoi/cfoi_rates_2022hb.pdf'>BLS Fatal Jobs</a><br/>
+        • <a href='https://www.investopedia.com/terms/p/present-value-annuity.asp'>Investopedia Annuity</a><br/>
+"""
+
+# Alternative scenarios in the report: (name, retirement age, multiplier on the
+# recommended monthly savings, key benefits, considerations)
+_RETIREMENT_SCENARIOS = (
+    ("Early Retirement", "55", 1.5,
+     "• More years of freedom\n• Pursue passions\n• Travel opportunities",
+     "• Higher savings required\n• Longer retirement period\n• Early withdrawal penalties"),
+    ("Standard Retirement", "65", 1.0,
+     "• Full social security benefits\n• Traditional retirement age\n• Balanced approach",
+     "• Standard savings rate\n• Moderate risk tolerance\n• Regular retirement benefits"),
+    ("Late Retirement", "70", 0.7,
+     "• Higher social security\n• More savings time\n• Lower monthly target",
+     "• Health considerations\n• Career sustainability\n• Family time trade-off"),
+    ("Phased Retirement", "60-70", 0.9,
+     "• Gradual transition\n• Part-time work option\n• Flexible schedule",
+     "• Income diversification\n• Skill maintenance\n• Work-life balance"),
+)
+
+def _pv_growing_annuity(first_cf: float, growth: float, rate: float, years: int) -> float:
+    """Present value of `years` yearly payments starting at first_cf and growing by `growth`,
+    discounted at `rate`: the closed form of sum(first_cf * r**year for year in range(years))
+    with r = (1 + growth) / (1 + rate). Zero or negative `years` is worth nothing."""
+    if years <= 0:
+        return 0.0
+    ratio = (1 + growth) / (1 + rate)
+    if ratio == 1:
+        return first_cf * years
+    return first_cf * (1 - ratio ** years) / (1 - ratio)
+
 class ReportGenerator:
-    def __init__(self, api_key: str):
-        self.client = genai.Client(api_key=api_key)
+    # Shared by every table in the report; TableStyle validates its commands on construction.
+    # Built when the module is imported, so no request ever races to create them
+    DEFAULT_TABLE_STYLE = TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#2874A6')),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 12),
+        ('BOTTOMPADDING', (0,0), (-1,0), 12),
+        ('BACKGROUND', (0,1), (-1,-1), colors.white),
+        ('TEXTCOLOR', (0,1), (-1,-1), colors.HexColor('#2C3E50')),
+        ('FONTNAME', (0,1), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,1), (-1,-1), 11),
+        ('GRID', (0,0), (-1,-1), 1, colors.HexColor('#BDC3C7')),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('TOPPADDING', (0,0), (-1,-1), 8),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+        ('LEFTPADDING', (0,0), (-1,-1), 10),
+        ('RIGHTPADDING', (0,0), (-1,-1), 10),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#F8F9F9')])
+    ])
+    # The scenario table has five columns of bullet text, so its body is a point smaller
+    SCENARIO_TABLE_STYLE = TableStyle(DEFAULT_TABLE_STYLE.getCommands() + [('FONTSIZE', (0,1), (-1,-1), 10)])
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key or GEMINI_API_KEY
+        self._client = None
         self.model = "gemini-2.0-flash"
 
         self.styles = getSampleStyleSheet()
-        self.title_style = ParagraphStyle('CustomTitle', parent=self.styles['Heading1'], fontSize=24, spaceAfter=30)
         self.heading_style = ParagraphStyle('CustomHeading', parent=self.styles['Heading2'], fontSize=16, spaceAfter=12)
         self.normal_style = ParagraphStyle('CustomNormal', parent=self.styles['Normal'], fontSize=12, spaceAfter=12)
         self.highlight_style = ParagraphStyle('Highlight', parent=self.styles['Normal'], fontSize=14, textColor=colors.red, backColor=colors.yellow, alignment=TA_CENTER, spaceBefore=12, spaceAfter=12)
 
+        # Custom styles for better typography
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=28,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#1A5276'),
+            fontName='Helvetica-Bold'
+        )
+
+        self.subtitle_style = ParagraphStyle(
+            'Subtitle',
+            parent=self.styles['Normal'],
+            fontSize=14,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#2C3E50'),
+            fontName='Helvetica'
+        )
+
+        self.section_style = ParagraphStyle(
+            'Section',
+            parent=self.styles['Heading2'],
+            fontSize=18,
+            spaceBefore=20,
+            spaceAfter=12,
+            textColor=colors.HexColor('#2874A6'),
+            fontName='Helvetica-Bold'
+        )
+
+        self.disclaimer_style = ParagraphStyle(
+            'Disclaimer',
+            parent=self.normal_style,
+            fontSize=9,
+            textColor=colors.HexColor('#7F8C8D'),
+            alignment=TA_CENTER,
+            spaceBefore=20
+        )
+
+        self.rec_title_style = ParagraphStyle('RecTitle', parent=self.normal_style, fontSize=12, textColor=colors.HexColor('#2874A6'), spaceBefore=10)
+        self.rec_item_style = ParagraphStyle('RecItem', parent=self.normal_style, fontSize=11, leftIndent=20)
+
+        # The grounding section has no per-user data, so its markup is parsed once
+        self.grounding_paragraph = Paragraph(GROUNDING_HTML, self.normal_style)
+
+        # Loaded on first lookup so PDF-only users never touch the cache file
+        self._insights_cache = None
+        self._insights_cache_dirty = False
+
+    @property
+    def client(self):
+        """The shared Gemini client for this generator's API key, created on first use."""
+        if self._client is None:
+            self._client = _get_client(self._api_key)
+        return self._client
+
+    def _insights_cache_keys(self, profile_dict: dict) -> tuple:
+        """Exact prompt-input hash first, then the quantized key shared by near-identical profiles."""
+        exact_key = hashlib.blake2b(canonical_json(profile_dict), digest_size=16).hexdigest()
+        return exact_key, self._insights_cache_key(profile_dict)
+
+    def _insights_cache_key(self, profile_dict: dict) -> tuple:
+        """Quantize every prompt field, so profiles share a cached analysis only when Gemini
+        would have seen near-identical input."""
+        return tuple(
+            (name, _quantize_prompt_field(name, value))
+            for name, value in sorted(profile_dict.items())
+        )
+
+    def _get_insights_cache(self) -> OrderedDict:
+        if self._insights_cache is None:
+            try:
+                with open(LLM_CACHE_PATH, 'rb') as f:
+                    self._insights_cache = OrderedDict(pickle.load(f))
+            except (OSError, EOFError, pickle.UnpicklingError):
+                self._insights_cache = OrderedDict()
+        return self._insights_cache
+
+    def _cached_insights(self, keys: tuple, profile):
+        cache = self._get_insights_cache()
+        for key in keys:
+            analysis = cache.get(key)
+            # Blank entries from before empty responses were rejected count as misses
+            if analysis:
+                break
+        else:
+            return None
+        cache.move_to_end(key)
+        return {
+            "analysis": analysis,
+            "status": "success",
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "profile_data_for_grounding": profile
+        }
+
+    def _store_insights(self, keys: tuple, analysis: str):
+        cache = self._get_insights_cache()
+        for key in keys:
+            cache[key] = analysis
+            cache.move_to_end(key)
+        while len(cache) > LLM_CACHE_SIZE:
+            cache.popitem(last=False)
+        if not self._insights_cache_dirty:
+            # Only processes that actually produced insights write the cache back
+            self._insights_cache_dirty = True
+            atexit.register(self._save_insights_cache)
+
+    def _save_insights_cache(self):
+        try:
+            os.makedirs(os.path.dirname(LLM_CACHE_PATH), exist_ok=True)
+            with open(LLM_CACHE_PATH, 'wb') as f:
+                pickle.dump(dict(self._insights_cache), f)
+        except OSError:
+            pass
+
+    def _prompt_profile(self, profile) -> dict:
+        """The profile fields sent to Gemini; also the input to the exact cache key."""
+        snapshot = _profile_snapshot(profile)
+        return {
+            "age": snapshot.get('age', 'N/A'),
+            "gender": snapshot.get('gender', 'N/A'),
+            "martial_status": snapshot.get('martial_status', 'N/A'),
+            "number_of_children": snapshot.get('number_of_children', 'N/A'),
+            "education_level": snapshot.get('education_level', 'N/A'),
+            "occupation": snapshot.get('occupation', 'N/A'),
+            "anual_working_hours": snapshot.get('anual_working_hours', 'N/A'),
+            "monthly_income": snapshot.get('monthly_income', 'N/A'),
+            "monthly_expenses": snapshot.get('monthly_expenses', 'N/A'),
+            "debt": snapshot.get('debt', 'N/A'),
+            "assets": snapshot.get('assets', 'N/A'),
+            "chronic_diseases": snapshot.get('chronic_diseases', []),
+            "lifestyle_habits": snapshot.get('lifestyle_habits', []),
+            "family_health_history": snapshot.get('family_health_history', [])
+        }
+
+    def _build_insights_prompt(self, profile_dict: dict) -> str:
+        """Only the per-user JSON; the fixed instructions go in INSIGHTS_CONFIG."""
+        return _to_json(profile_dict)
+
+    def warmup(self) -> bool:
+        """Load the SDK's transport and check the key and model without spending tokens."""
+        try:
+            self.client.models.get(model=self.model)
+            return True
+        except Exception:
+            return False
+
     def generate_llm_insights(self, results: dict) -> dict:
         profile = results.get('profile')
         if profile is None:
             return {"analysis": "Error: User profile data was not found.", "status": "error", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "profile_data_for_grounding": {}}
 
-        prompt = f"""
-        You are a financial planning assistant. Here is the user profile data in JSON format:
-        {{
-            "age": {getattr(profile, 'age', 'N/A')},
-            "gender": "{getattr(profile, 'gender', 'N/A')}",
-            "martial_status": "{getattr(profile, 'martial_status', 'N/A')}",
-            "number_of_children": {getattr(profile, 'number_of_children', 'N/A')},
-            "education_level": "{getattr(profile, 'education_level', 'N/A')}",
-            "occupation": "{getattr(profile, 'occupation', 'N/A')}",
-            "anual_working_hours": {getattr(profile, 'anual_working_hours', 'N/A')},
-            "monthly_income": {getattr(profile, 'monthly_income', 'N/A')},
-            "monthly_expenses": {getattr(profile, 'monthly_expenses', 'N/A')},
-            "debt": {getattr(profile, 'debt', 'N/A')},
-            "assets": {getattr(profile, 'assets', 'N/A')},
-            "chronic_diseases": {getattr(profile, 'chronic_diseases', [])},
-            "lifestyle_habits": {getattr(profile, 'lifestyle_habits', [])},
-            "family_health_history": {getattr(profile, 'family_health_history', [])}
-        }}
-
-        Based on this data, generate a professional analysis including:
-        - Life expectancy explanation
-        - Financial sufficiency assessment
-        - Scenario comparison table with different retirement ages
-        - Highlighted recommendations for savings and retirement strategy
-        - Risk factors with grounding
-        """
+        snapshot = _profile_snapshot(profile)
+        profile_dict = self._prompt_profile(snapshot)
+        cache_keys = self._insights_cache_keys(profile_dict)
+        cached = self._cached_insights(cache_keys, profile)
+        if cached is not None:
+            return cached
+
+        prompt = self._build_insights_prompt(profile_dict)
 
         try:
             response = self.client.models.generate_content(
                 model=self.model,
-                contents=prompt
+                contents=prompt,
+                config=INSIGHTS_CONFIG
             )
+            analysis = _require_analysis(response.text)
+            self._store_insights(cache_keys, analysis)
             return {
-                "analysis": response.text,
+                "analysis": analysis,
                 "status": "success",
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "profile_data_for_grounding": profile
@@ -69,50 +480,205 @@ class ReportGenerator:
                 "profile_data_for_grounding": profile
             }
 
-    def calculate_life_expectancy(self, profile):
-        # SSA 2024: https://www.ssa.gov/oact/STATS/table4c6.html
-        gender = getattr(profile, 'gender', '').lower()
-        base = 81.1 if gender == 'female' else 76.1  # SSA base life expectancy
+    def generate_llm_insights_batch(self, results_list: list) -> list:
+        """Insights for many results at once, in input order. Cached profiles are answered
+        locally; the rest go to Gemini LLM_BATCH_SIZE profiles per request."""
+        insights = [None] * len(results_list)
+        pending = []
+        for index, results in enumerate(results_list):
+            profile = results.get('profile')
+            if profile is None:
+                insights[index] = {"analysis": "Error: User profile data was not found.", "status": "error", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "profile_data_for_grounding": {}}
+                continue
 
-        # Health adjustment: Each chronic disease reduces by 3 years
-        health = getattr(profile, 'chronic_diseases', [])
-        health_adj = len(health) * -3
+            snapshot = _profile_snapshot(profile)
+            profile_dict = self._prompt_profile(snapshot)
+            cache_keys = self._insights_cache_keys(profile_dict)
+            cached = self._cached_insights(cache_keys, profile)
+            if cached is not None:
+                insights[index] = cached
+            else:
+                pending.append((index, profile, profile_dict, cache_keys))
 
-        # Lifestyle adjustment: Each positive habit adds 2 years
-        habits = getattr(profile, 'lifestyle_habits', [])
-        # WHO/CDC: https://www.who.int/news-room/fact-sheets/detail/healthy-diet
-        positive_habits = ['regular_exercise', 'healthy_diet', 'no_smoking', 'moderate_alcohol', 'stress_management']
-        lifestyle_adj = sum(1 for h in habits if h in positive_habits) * 2
+        for start in range(0, len(pending), LLM_BATCH_SIZE):
+            chunk = pending[start:start + LLM_BATCH_SIZE]
+            try:
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=_to_json([profile_dict for _, _, profile_dict, _ in chunk]),
+                    config=INSIGHTS_BATCH_CONFIG
+                )
+                analyses = response.parsed
+                if not isinstance(analyses, list) or len(analyses) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} analyses in the batch response")
+            except Exception as e:
+                for index, profile, _, _ in chunk:
+                    insights[index] = {
+                        "analysis": f"Error generating insights: {str(e)}",
+                        "status": "error",
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "profile_data_for_grounding": profile
+                    }
+                continue
 
-        # Family health history: -4 for early death, +4 for long life
-        # SSA: https://www.ssa.gov/oact/STATS/table4c6.html
-        family = getattr(profile, 'family_health_history', [])
-        family_adj = -4 if 'early_death' in family else (4 if 'long_life' in family else 0)
+            for (index, profile, _, cache_keys), analysis in zip(chunk, analyses):
+                try:
+                    _require_analysis(analysis)
+                except ValueError as e:
+                    insights[index] = {
+                        "analysis": f"Error generating insights: {str(e)}",
+                        "status": "error",
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "profile_data_for_grounding": profile
+                    }
+                    continue
+                self._store_insights(cache_keys, analysis)
+                insights[index] = {
+                    "analysis": analysis,
+                    "status": "success",
+                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "profile_data_for_grounding": profile
+                }
+        return insights
 
-        # Education: +2 for university/graduate/phd
-        education = getattr(profile, 'education_level', '').lower()
-        edu_adj = 2 if education in ['university', 'graduate', 'phd'] else 0
+    async def _with_backoff(self, call):
+        """Await call(), retrying with exponential backoff on quota errors."""
+        from google.genai import errors as genai_errors
+        for attempt in range(LLM_MAX_RETRIES):
+            try:
+                return await call()
+            except genai_errors.APIError as e:
+                if e.code != 429 or attempt == LLM_MAX_RETRIES - 1:
+                    raise
+                await asyncio.sleep(LLM_BACKOFF_SECONDS * 2 ** attempt)
 
-        # Income: +2 if monthly income > 10000
-        income = getattr(profile, 'monthly_income', 0)
-        income_adj = 2 if income > 10000 else 0
+    async def _generate_content_async(self, prompt: str):
+        """Call Gemini, backing off on quota errors. Callers hold _LLM_SEMAPHORE."""
+        return await self._with_backoff(lambda: self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=INSIGHTS_CONFIG
+        ))
 
-        # Occupation: -2 for risky jobs
-        # BLS: https://www.bls.gov/iif/oshwc/cfoi/cfoi_rates_2022hb.pdf
-        occupation = getattr(profile, 'occupation', '').lower()
-        risky_jobs = ['construction', 'mining', 'police', 'firefighter']
-        job_adj = -2 if any(job in occupation for job in risky_jobs) else 0
+    async def _open_content_stream(self, prompt: str) -> tuple:
+        """Start a Gemini stream and return (first chunk or None, remaining chunks), backing
+        off on quota errors. The SDK only sends the request on first iteration, so the first
+        chunk is fetched inside the retry, before anything reaches the user. Callers hold
+        _LLM_SEMAPHORE."""
+        async def start():
+            chunks = aiter(await self.client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=prompt,
+                config=INSIGHTS_CONFIG
+            ))
+            return await anext(chunks, None), chunks
 
-        return base + health_adj + lifestyle_adj + family_adj + edu_adj + income_adj + job_adj
+        return await self._with_backoff(start)
+
+    async def generate_llm_insights_async(self, results: dict) -> dict:
+        """Non-blocking variant of generate_llm_insights using the async Gemini client."""
+        profile = results.get('profile')
+        if profile is None:
+            return {"analysis": "Error: User profile data was not found.", "status": "error", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "profile_data_for_grounding": {}}
+
+        snapshot = _profile_snapshot(profile)
+        profile_dict = self._prompt_profile(snapshot)
+        cache_keys = self._insights_cache_keys(profile_dict)
+        cached = self._cached_insights(cache_keys, profile)
+        if cached is not None:
+            return cached
+
+        prompt = self._build_insights_prompt(profile_dict)
+
+        try:
+            async with _LLM_SEMAPHORE:
+                response = await self._generate_content_async(prompt)
+            analysis = _require_analysis(response.text)
+            self._store_insights(cache_keys, analysis)
+            return {
+                "analysis": analysis,
+                "status": "success",
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "profile_data_for_grounding": profile
+            }
+        except Exception as e:
+            return {
+                "analysis": f"Error generating insights: {str(e)}",
+                "status": "error",
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "profile_data_for_grounding": profile
+            }
+
+    async def stream_llm_insights(self, results: dict):
+        """Yield insights whose analysis grows as Gemini streams it; the last item is final."""
+        profile = results.get('profile')
+        if profile is None:
+            yield {"analysis": "Error: User profile data was not found.", "status": "error", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "profile_data_for_grounding": {}}
+            return
+
+        snapshot = _profile_snapshot(profile)
+        profile_dict = self._prompt_profile(snapshot)
+        cache_keys = self._insights_cache_keys(profile_dict)
+        cached = self._cached_insights(cache_keys, profile)
+        if cached is not None:
+            yield cached
+            return
+
+        prompt = self._build_insights_prompt(profile_dict)
+        analysis = ""
+
+        try:
+            async with _LLM_SEMAPHORE:
+                chunk, chunks = await self._open_content_stream(prompt)
+                while chunk is not None:
+                    analysis += chunk.text or ""
+                    yield {
+                        "analysis": analysis,
+                        "status": "streaming",
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "profile_data_for_grounding": profile
+                    }
+                    chunk = await anext(chunks, None)
+            _require_analysis(analysis)
+        except Exception as e:
+            yield {
+                "analysis": f"Error generating insights: {str(e)}",
+                "status": "error",
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "profile_data_for_grounding": profile
+            }
+            return
+
+        self._store_insights(cache_keys, analysis)
+        yield {
+            "analysis": analysis,
+            "status": "success",
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "profile_data_for_grounding": profile
+        }
+
+    def calculate_life_expectancy(self, profile):
+        snapshot = _profile_snapshot(profile)
+        # List order never changes the result, so sorted tuples let reordered inputs share an entry
+        return _life_expectancy(
+            snapshot.get('gender', '').lower(),
+            tuple(sorted(snapshot.get('chronic_diseases', []))),
+            tuple(sorted(snapshot.get('lifestyle_habits', []))),
+            tuple(sorted(snapshot.get('family_health_history', []))),
+            snapshot.get('education_level', '').lower(),
+            snapshot.get('monthly_income', 0) > 10000,
+            snapshot.get('occupation', '').lower()
+        )
 
     def calculate_retirement_metrics(self, profile, results):
         """Calculate retirement metrics based on user profile and results"""
-        current_age = getattr(profile, 'age', 0)
-        current_savings = getattr(profile, 'current_savings', 0.0)
-        monthly_income = getattr(profile, 'monthly_income', 0.0)
-        monthly_expenses = getattr(profile, 'monthly_expenses', 0.0)
-        health_conditions = getattr(profile, 'chronic_diseases', [])
-        lifestyle_habits = getattr(profile, 'lifestyle_habits', [])
+        snapshot = _profile_snapshot(profile)
+        current_age = snapshot.get('age', 0)
+        current_savings = snapshot.get('current_savings', 0.0)
+        monthly_income = snapshot.get('monthly_income', 0.0)
+        monthly_expenses = snapshot.get('monthly_expenses', 0.0)
+        health_conditions = snapshot.get('chronic_diseases', [])
+        lifestyle_habits = snapshot.get('lifestyle_habits', [])
         
         # Financial assumptions
         # Inflation: 3% (BLS CPI: https://www.bls.gov/cpi/)
@@ -122,7 +688,7 @@ class ReportGenerator:
         annual_expenses = monthly_expenses * 12
         
         # Calculate life expectancy using the new function
-        adjusted_life_expectancy = self.calculate_life_expectancy(profile)
+        adjusted_life_expectancy = self.calculate_life_expectancy(snapshot)
         
         # More dynamic recommended retirement age calculation
         # Health: Each chronic disease reduces by 15%
@@ -132,13 +698,12 @@ class ReportGenerator:
         # Income: relative to 1.2x annual expenses
         income_factor = min(1, monthly_income / (annual_expenses * 1.2))
         # Lifestyle: positive habits (WHO/CDC)
-        positive_habits = ['regular_exercise', 'healthy_diet', 'no_smoking', 'moderate_alcohol', 'stress_management']
-        lifestyle_factor = sum(1 for habit in lifestyle_habits if habit in positive_habits) / max(1, len(positive_habits))
+        lifestyle_factor = sum(1 for habit in lifestyle_habits if habit in _POSITIVE_HABITS) / max(1, len(_POSITIVE_HABITS))
         # Education: +2 for university/graduate/phd
-        education = getattr(profile, 'education_level', '').lower()
+        education = snapshot.get('education_level', '').lower()
         edu_factor = 1 if education in ['university', 'graduate', 'phd'] else 0
         # Family health history: -0.3 for early death, +0.3 for long life
-        family = getattr(profile, 'family_health_history', [])
+        family = snapshot.get('family_health_history', [])
         family_factor = -0.3 if 'early_death' in family else (0.3 if 'long_life' in family else 0)
         
         base_retirement_age = 65  # Standard retirement age
@@ -160,26 +725,19 @@ class ReportGenerator:
         future_annual_expenses = annual_expenses * (1 + inflation_rate) ** years_to_retirement
         
         # Calculate required savings using present value of annuity
-        required_savings = 0
-        for year in range(int(retirement_duration)):
-            year_expense = future_annual_expenses * (1 + inflation_rate) ** year
-            present_value = year_expense / (1 + investment_return) ** year
-            required_savings += present_value
+        annuity_years = int(retirement_duration)
+        required_savings = _pv_growing_annuity(future_annual_expenses, inflation_rate, investment_return, annuity_years)
         
         # Adjust for social security benefits
         social_security_benefit = monthly_income * 0.4 * (1 + (recommended_retirement_age - 65) * 0.08)  # 8% increase per year after 65
-        social_security_present_value = 0
-        for year in range(int(retirement_duration)):
-            year_benefit = social_security_benefit * 12 * (1 + inflation_rate) ** year
-            present_value = year_benefit / (1 + investment_return) ** year
-            social_security_present_value += present_value
+        social_security_present_value = _pv_growing_annuity(social_security_benefit * 12, inflation_rate, investment_return, annuity_years)
         
         required_savings -= social_security_present_value
         
         # Calculate financial readiness components
         income_replacement_ratio = (monthly_income * 12) / (future_annual_expenses)
         savings_coverage_ratio = current_savings / required_savings if required_savings > 0 else 0
-        debt_to_income_ratio = getattr(profile, 'debt', 0.0) / (monthly_income * 12) if monthly_income > 0 else 0
+        debt_to_income_ratio = snapshot.get('debt', 0.0) / (monthly_income * 12) if monthly_income > 0 else 0
         
         financial_readiness_components = {
             'savings_coverage': savings_coverage_ratio * 0.4,
@@ -208,22 +766,11 @@ class ReportGenerator:
             'debt_to_income_ratio': debt_to_income_ratio
         }
 
-    def create_pdf_report(self, results: dict, llm_insights: dict, output_path: str):
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=letter,
-            rightMargin=40,
-            leftMargin=40,
-            topMargin=40,
-            bottomMargin=40
-        )
-        story = []
-
-        # Calculate metrics
-        profile = results.get('profile')
+    def apply_retirement_metrics(self, results: dict, profile=None) -> dict:
+        """Update results in place with the report's retirement metrics and return them"""
+        if profile is None:
+            profile = results.get('profile')
         metrics = self.calculate_retirement_metrics(profile, results)
-        
-        # Update results with calculated metrics
         results.update({
             'recommended_retirement_age': metrics['recommended_retirement_age'],
             'life_expectancy': metrics['adjusted_life_expectancy'],
@@ -231,315 +778,191 @@ class ReportGenerator:
             'financial_ratio': metrics['financial_ratio'],
             'monthly_savings_needed': metrics['monthly_savings_needed']
         })
+        return metrics
 
-        # Custom styles for better typography
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=28,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#1A5276'),
-            fontName='Helvetica-Bold'
+    def create_pdf_report(self, results: dict, llm_insights: Optional[dict], output: Union[str, BinaryIO]):
+        """Render the report to a file path or any writable binary stream. Only the insights
+        timestamp is printed, so llm_insights may be None when the PDF is built before Gemini answers."""
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=letter,
+            rightMargin=40,
+            leftMargin=40,
+            topMargin=40,
+            bottomMargin=40,
+            pageCompression=1  # zlib-compress page content streams
         )
+        story = []
 
-        subtitle_style = ParagraphStyle(
-            'Subtitle',
-            parent=self.styles['Normal'],
-            fontSize=14,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#2C3E50'),
-            fontName='Helvetica'
-        )
+        # Calculate metrics
+        profile = _profile_snapshot(results.get('profile'))
+        self.apply_retirement_metrics(results, profile)
 
-        section_style = ParagraphStyle(
-            'Section',
-            parent=self.styles['Heading2'],
-            fontSize=18,
-            spaceBefore=20,
-            spaceAfter=12,
-            textColor=colors.HexColor('#2874A6'),
-            fontName='Helvetica-Bold'
-        )
+        # Values shown in more than one section are read and formatted once
+        retirement_age = results.get('recommended_retirement_age', 65)
+        financial_ratio = results.get('financial_ratio', 0.0)
+        life_expectancy_str = f"{results.get('life_expectancy', 85):.1f}"
+        financial_ratio_str = f"{financial_ratio:.2f}"
+        required_savings_str = f"${results.get('required_savings', 0):,.2f}"
+        monthly_savings_needed = results.get('monthly_savings_needed', 0)
+        monthly_savings_str = f"${monthly_savings_needed:,.2f}"
 
         # Header with enhanced styling
-        story.append(Paragraph("RETIREMENT PLANNING & INSURANCE ANALYSIS", title_style))
+        story.append(Paragraph("RETIREMENT PLANNING & INSURANCE ANALYSIS", self.title_style))
         story.append(Paragraph(
             "A Comprehensive Financial Planning Report for Young Adults",
-            subtitle_style
+            self.subtitle_style
         ))
         story.append(Spacer(1, 20))
 
         # User Profile Table Section
-        story.append(Paragraph("USER PROFILE", section_style))
-        profile_data = [
-            ["Field", "Value"],
-            ["Age", getattr(profile, 'age', 'N/A')],
-            ["Gender", getattr(profile, 'gender', 'N/A')],
-            ["Marital Status", getattr(profile, 'marital_status', 'N/A')],
-            ["Occupation", getattr(profile, 'occupation', 'N/A')],
-            ["Work Experience (years)", getattr(profile, 'work_experience', 'N/A')],
-            ["Education Level", getattr(profile, 'education_level', 'N/A')],
-            ["Current Savings ($)", f"${getattr(profile, 'current_savings', 0):,.2f}"],
-            ["Monthly Income ($)", f"${getattr(profile, 'monthly_income', 0):,.2f}"],
-            ["Monthly Expenses ($)", f"${getattr(profile, 'monthly_expenses', 0):,.2f}"],
-            ["Total Debt ($)", f"${getattr(profile, 'debt', 0):,.2f}"],
-            ["Chronic Diseases", ", ".join(getattr(profile, 'chronic_diseases', [])) or "None"],
-            ["Family Health History", ", ".join(getattr(profile, 'family_health_history', [])) or "None"],
-            ["Lifestyle Habits", ", ".join(getattr(profile, 'lifestyle_habits', [])) or "None"],
-        ]
+        story.append(Paragraph("USER PROFILE", self.section_style))
+        profile_data = [["Field", "Value"]]
+        profile_data.extend(
+            [label, _format_profile_value(profile.get(key, _PROFILE_FIELD_DEFAULTS[kind]), kind)]
+            for label, key, kind in _PROFILE_FIELDS
+        )
         profile_table = Table(profile_data, colWidths=[2.5*inch, 4.5*inch])
-        profile_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#2874A6')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 12),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('BACKGROUND', (0,1), (-1,-1), colors.white),
-            ('TEXTCOLOR', (0,1), (-1,-1), colors.HexColor('#2C3E50')),
-            ('FONTNAME', (0,1), (-1,-1), 'Helvetica'),
-            ('FONTSIZE', (0,1), (-1,-1), 11),
-            ('GRID', (0,0), (-1,-1), 1, colors.HexColor('#BDC3C7')),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('LEFTPADDING', (0,0), (-1,-1), 10),
-            ('RIGHTPADDING', (0,0), (-1,-1), 10),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#F8F9F9')])
-        ]))
+        profile_table.setStyle(self.DEFAULT_TABLE_STYLE)
         story.append(profile_table)
         story.append(Spacer(1, 20))
 
         # Executive Summary Section
-        story.append(Paragraph("EXECUTIVE SUMMARY", section_style))
+        story.append(Paragraph("EXECUTIVE SUMMARY", self.section_style))
         summary_text = f"""
         This report provides a comprehensive analysis of your retirement planning strategy, taking into account your current financial situation, 
         health factors, and lifestyle choices. As an 18-year-old female, you have a significant advantage in retirement planning due to the power of 
-        compound interest and long-term investment growth. Your recommended retirement age is {results.get('recommended_retirement_age', 65)} years, 
-        with an estimated life expectancy of {results.get('life_expectancy', 85):.1f} years. Your current financial readiness ratio is {results.get('financial_ratio', 0.0):.2f}, 
-        indicating {'strong' if results.get('financial_ratio', 0.0) >= 1.0 else 'needs improvement'} preparation for retirement.
+        compound interest and long-term investment growth. Your recommended retirement age is {retirement_age} years, 
+        with an estimated life expectancy of {life_expectancy_str} years. Your current financial readiness ratio is {financial_ratio_str}, 
+        indicating {'strong' if financial_ratio >= 1.0 else 'needs improvement'} preparation for retirement.
         """
         story.append(Paragraph(summary_text, self.normal_style))
         story.append(Spacer(1, 20))
 
         # Key Metrics Section with modern styling
-        story.append(Paragraph("KEY METRICS", section_style))
+        story.append(Paragraph("KEY METRICS", self.section_style))
         metrics_data = [
             ["Metric", "Value", "Status"],
-            ["Recommended Retirement Age", f"{results.get('recommended_retirement_age', 65)} years", 
+            ["Recommended Retirement Age", f"{retirement_age} years", 
              "Based on your profile"],
-            ["Life Expectancy", f"{results.get('life_expectancy', 85):.1f} years", 
+            ["Life Expectancy", f"{life_expectancy_str} years", 
              "Based on gender and health factors"],
-            ["Financial Readiness", f"{results.get('financial_ratio', 0.0):.2f}", 
+            ["Financial Readiness", financial_ratio_str, 
              "Target: 1.0 or higher"],
-            ["Required Savings", f"${results.get('required_savings', 0):,.2f}", 
+            ["Required Savings", required_savings_str, 
              "Based on projected expenses"]
         ]
         metrics_table = Table(metrics_data, colWidths=[2.5*inch, 2*inch, 2.5*inch])
-        metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#2874A6')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 12),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('BACKGROUND', (0,1), (-1,-1), colors.white),
-            ('TEXTCOLOR', (0,1), (-1,-1), colors.HexColor('#2C3E50')),
-            ('FONTNAME', (0,1), (-1,-1), 'Helvetica'),
-            ('FONTSIZE', (0,1), (-1,-1), 11),
-            ('GRID', (0,0), (-1,-1), 1, colors.HexColor('#BDC3C7')),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('LEFTPADDING', (0,0), (-1,-1), 10),
-            ('RIGHTPADDING', (0,0), (-1,-1), 10),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#F8F9F9')])
-        ]))
+        metrics_table.setStyle(self.DEFAULT_TABLE_STYLE)
         story.append(metrics_table)
         story.append(Spacer(1, 20))
 
         # Alternative Retirement Scenarios Section
-        story.append(Paragraph("ALTERNATIVE RETIREMENT SCENARIOS", section_style))
-        scenario_data = [
-            ["Scenario", "Retirement Age", "Monthly Savings Needed", "Key Benefits", "Considerations"],
-            ["Early Retirement", "55", 
-             f"${results.get('monthly_savings_needed', 0) * 1.5:,.2f}",
-             "• More years of freedom\n• Pursue passions\n• Travel opportunities",
-             "• Higher savings required\n• Longer retirement period\n• Early withdrawal penalties"],
-            
-            ["Standard Retirement", "65", 
-             f"${results.get('monthly_savings_needed', 0):,.2f}",
-             "• Full social security benefits\n• Traditional retirement age\n• Balanced approach",
-             "• Standard savings rate\n• Moderate risk tolerance\n• Regular retirement benefits"],
-            
-            ["Late Retirement", "70", 
-             f"${results.get('monthly_savings_needed', 0) * 0.7:,.2f}",
-             "• Higher social security\n• More savings time\n• Lower monthly target",
-             "• Health considerations\n• Career sustainability\n• Family time trade-off"],
-            
-            ["Phased Retirement", "60-70", 
-             f"${results.get('monthly_savings_needed', 0) * 0.9:,.2f}",
-             "• Gradual transition\n• Part-time work option\n• Flexible schedule",
-             "• Income diversification\n• Skill maintenance\n• Work-life balance"]
-        ]
+        story.append(Paragraph("ALTERNATIVE RETIREMENT SCENARIOS", self.section_style))
+        scenario_data = [["Scenario", "Retirement Age", "Monthly Savings Needed", "Key Benefits", "Considerations"]]
+        scenario_data.extend(
+            [name, age, monthly_savings_str if multiplier == 1 else f"${monthly_savings_needed * multiplier:,.2f}",
+             benefits, considerations]
+            for name, age, multiplier, benefits, considerations in _RETIREMENT_SCENARIOS
+        )
         
         scenario_table = Table(scenario_data, colWidths=[1.5*inch, 1*inch, 1.5*inch, 2*inch, 2*inch])
-        scenario_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#2874A6')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 12),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('BACKGROUND', (0,1), (-1,-1), colors.white),
-            ('TEXTCOLOR', (0,1), (-1,-1), colors.HexColor('#2C3E50')),
-            ('FONTNAME', (0,1), (-1,-1), 'Helvetica'),
-            ('FONTSIZE', (0,1), (-1,-1), 10),
-            ('GRID', (0,0), (-1,-1), 1, colors.HexColor('#BDC3C7')),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('LEFTPADDING', (0,0), (-1,-1), 10),
-            ('RIGHTPADDING', (0,0), (-1,-1), 10),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#F8F9F9')])
-        ]))
+        scenario_table.setStyle(self.SCENARIO_TABLE_STYLE)
         story.append(scenario_table)
         story.append(Spacer(1, 20))
 
         # Risk Assessment Section with modern styling
-        story.append(Paragraph("RISK ASSESSMENT", section_style))
+        story.append(Paragraph("RISK ASSESSMENT", self.section_style))
         risk_data = [
             ["Risk Factor", "Level", "Impact", "Mitigation Strategy"],
             ["Longevity Risk", "High", 
-             f"${results.get('required_savings', 0):,.2f}", "Long-term Care Insurance"],
+             required_savings_str, "Long-term Care Insurance"],
             ["Market Risk", "Medium", "Variable", "Diversified Portfolio"],
             ["Health Risk", "Low", 
              "Minimal", "Regular Health Check-ups"],
             ["Inflation Risk", "High", "Long-term", "Inflation-Protected Securities"]
         ]
         risk_table = Table(risk_data, colWidths=[2*inch, 1.5*inch, 2*inch, 2.5*inch])
-        risk_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#2874A6')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 12),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('BACKGROUND', (0,1), (-1,-1), colors.white),
-            ('TEXTCOLOR', (0,1), (-1,-1), colors.HexColor('#2C3E50')),
-            ('FONTNAME', (0,1), (-1,-1), 'Helvetica'),
-            ('FONTSIZE', (0,1), (-1,-1), 11),
-            ('GRID', (0,0), (-1,-1), 1, colors.HexColor('#BDC3C7')),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('LEFTPADDING', (0,0), (-1,-1), 10),
-            ('RIGHTPADDING', (0,0), (-1,-1), 10),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#F8F9F9')])
-        ]))
+        risk_table.setStyle(self.DEFAULT_TABLE_STYLE)
         story.append(risk_table)
         story.append(Spacer(1, 20))
 
         # Recommendations Section
-        story.append(Paragraph("RECOMMENDATIONS", section_style))
+        story.append(Paragraph("RECOMMENDATIONS", self.section_style))
+        title, item, blank = self.rec_title_style, self.rec_item_style, self.normal_style
         recommendations = [
-            "1. Savings Strategy:",
-            f"• Target monthly savings: ${results.get('monthly_savings_needed', 0):,.2f}",
-            "• Start with a high-yield savings account",
-            "• Consider opening a Roth IRA",
-            "• Take advantage of employer matching programs",
-            "",
-            "2. Investment Approach:",
-            "• Focus on growth-oriented investments",
-            "• Consider index funds and ETFs",
-            "• Maintain a diversified portfolio",
-            "• Regular portfolio rebalancing",
-            "",
-            "3. Risk Management:",
-            "• Build an emergency fund (3-6 months of expenses)",
-            "• Consider term life insurance",
-            "• Maintain health insurance coverage",
-            "• Regular financial check-ups",
-            "",
-            "4. Education and Career:",
-            "• Invest in your education and skills",
-            "• Build a strong professional network",
-            "• Stay updated with industry trends",
-            "• Consider side hustles for additional income"
+            ("1. Savings Strategy:", title),
+            (f"• Target monthly savings: {monthly_savings_str}", item),
+            ("• Start with a high-yield savings account", item),
+            ("• Consider opening a Roth IRA", item),
+            ("• Take advantage of employer matching programs", item),
+            ("", blank),
+            ("2. Investment Approach:", title),
+            ("• Focus on growth-oriented investments", item),
+            ("• Consider index funds and ETFs", item),
+            ("• Maintain a diversified portfolio", item),
+            ("• Regular portfolio rebalancing", item),
+            ("", blank),
+            ("3. Risk Management:", title),
+            ("• Build an emergency fund (3-6 months of expenses)", item),
+            ("• Consider term life insurance", item),
+            ("• Maintain health insurance coverage", item),
+            ("• Regular financial check-ups", item),
+            ("", blank),
+            ("4. Education and Career:", title),
+            ("• Invest in your education and skills", item),
+            ("• Build a strong professional network", item),
+            ("• Stay updated with industry trends", item),
+            ("• Consider side hustles for additional income", item)
         ]
         
-        for rec in recommendations:
-            if rec.startswith("1.") or rec.startswith("2.") or rec.startswith("3.") or rec.startswith("4."):
-                story.append(Paragraph(rec, ParagraphStyle('RecTitle', parent=self.normal_style, fontSize=12, textColor=colors.HexColor('#2874A6'), spaceBefore=10)))
-            elif rec.startswith("•"):
-                story.append(Paragraph(rec, ParagraphStyle('RecItem', parent=self.normal_style, fontSize=11, leftIndent=20)))
-            else:
-                story.append(Paragraph(rec, self.normal_style))
+        story.extend(Paragraph(text, style) for text, style in recommendations)
         
         story.append(Spacer(1, 20))
 
         # Grounding & Methodology Section
-        story.append(Paragraph("GROUNDING & METHODOLOGY", section_style))
-        grounding_text = f"""
-        <b>Data Sources & Assumptions:</b><br/>
-        • <b>Life Expectancy:</b> Based on Social Security Administration (SSA) 2024 tables (<a href='https://www.ssa.gov/oact/STATS/table4c6.html'>link</a>), adjusted for gender, chronic diseases, lifestyle habits, family health history, education, income, and occupation.<br/>
-        • <b>Financial Calculations:</b> Assumes 3% annual inflation (<a href='https://www.bls.gov/cpi/'>BLS CPI</a>) and 5% annual investment return (<a href='https://investor.vanguard.com/investor-resources-education/article/investing-return-expectations'>Vanguard</a>), unless otherwise specified.<br/>
-        • <b>Social Security:</b> Estimated as 40% of current income, with an 8% increase per year after age 65 (<a href='https://www.ssa.gov/benefits/retirement/planner/ageincrease.html'>SSA</a>).<br/>
-        • <b>Healthy Habits:</b> Based on WHO and CDC recommendations (<a href='https://www.who.int/news-room/fact-sheets/detail/healthy-diet'>WHO</a>, <a href='https://www.cdc.gov/chronicdisease/resources/publications/aag/lifestyle.htm'>CDC</a>).<br/>
-        • <b>Risky Occupations:</b> Based on BLS fatality statistics (<a href='https://www.bls.gov/iif/oshwc/cfoi/cfoi_rates_2022hb.pdf'>BLS</a>).<br/>
-        <br/>
-        <b>Calculation Methods:</b><br/>
-        • <b>Life Expectancy:</b> SSA base + (-3 years per chronic disease) + (2 years per positive habit) + (family history, education, income, occupation adjustments).<br/>
-        • <b>Recommended Retirement Age:</b> 65 - (health, savings, income, lifestyle, education, family factors; see formula below).<br/>
-        • <b>Required Savings:</b> Present value of projected annual expenses during retirement, minus present value of social security benefits (<a href='https://www.investopedia.com/terms/p/present-value-annuity.asp'>Investopedia</a>).<br/>
-        <br/>
-        <b>User Inputs Used:</b><br/>
-        Age, gender, chronic diseases, lifestyle habits, family health history, education level, monthly income, monthly expenses, current savings, debt, occupation.<br/>
-        <br/>
-        <b>Key Formulas:</b><br/>
-        <b>Life Expectancy:</b> SSA base + (-3 × chronic diseases) + (2 × positive habits) + family/education/income/job adj.<br/>
-        <b>Retirement Age:</b> 65 - [health_factor × 7 + savings_factor × 4 + income_factor × 3 + lifestyle_factor × 3 + edu_factor × 2 + family_factor × 3]<br/>
-        <b>Required Savings:</b> PV of (annual expenses - social security) over retirement duration.<br/>
-        <br/>
-        <b>How Your Data Affects Results:</b><br/>
-        • <b>More chronic diseases</b> → lower life expectancy, later retirement age.<br/>
-        • <b>More positive habits</b> → higher life expectancy, earlier retirement age.<br/>
-        • <b>Higher income/savings</b> → earlier retirement possible.<br/>
-        • <b>Risky occupation/family history</b> → lower life expectancy.<br/>
-        <br/>
-        <b>References:</b><br/>
-        • <a href='https://www.ssa.gov/oact/STATS/table4c6.html'>SSA Life Table</a><br/>
-        • <a href='https://www.bls.gov/cpi/'>BLS CPI</a><br/>
-        • <a href='https://investor.vanguard.com/investor-resources-education/article/investing-return-expectations'>Vanguard Returns</a><br/>
-        • <a href='https://www.ssa.gov/benefits/retirement/planner/ageincrease.html'>SSA Retirement Planner</a><br/>
-        • <a href='https://www.ssa.gov/policy/docs/ssb/v75n4/v75n4p1.html'>SSA Replacement Rates</a><br/>
-        • <a href='https://www.who.int/news-room/fact-sheets/detail/healthy-diet'>WHO Healthy Diet</a><br/>
-        • <a href='https://www.cdc.gov/chronicdisease/resources/publications/aag/lifestyle.htm'>CDC Healthy Living</a><br/>
-        • <a href='https://www.bls.gov/iif/oshwc/cfoi/cfoi_rates_2022hb.pdf'>BLS Fatal Jobs</a><br/>
-        • <a href='https://www.investopedia.com/terms/p/present-value-annuity.asp'>Investopedia Annuity</a><br/>
-        """
-        story.append(Paragraph(grounding_text, self.normal_style))
+        story.append(Paragraph("GROUNDING & METHODOLOGY", self.section_style))
+        # Shallow copy: reuses the parsed markup without sharing layout state between builds
+        story.append(copy.copy(self.grounding_paragraph))
         story.append(Spacer(1, 20))
 
         # Disclaimer with modern styling
-        disclaimer_style = ParagraphStyle(
-            'Disclaimer',
-            parent=self.normal_style,
-            fontSize=9,
-            textColor=colors.HexColor('#7F8C8D'),
-            alignment=TA_CENTER,
-            spaceBefore=20
-        )
-        
         disclaimer = """
         This report is generated using AI-powered analysis and should be reviewed by a qualified financial advisor. 
         All calculations are based on provided data and industry-standard actuarial tables. 
         Past performance is not indicative of future results.
         """
-        story.append(Paragraph(disclaimer, disclaimer_style))
+        story.append(Paragraph(disclaimer, self.disclaimer_style))
         story.append(Spacer(1, 12))
-        story.append(Paragraph(f"Report generated on: {llm_insights['timestamp']}", disclaimer_style))
+        generated_on = llm_insights['timestamp'] if llm_insights else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        story.append(Paragraph(f"Report generated on: {generated_on}", self.disclaimer_style))
         
         doc.build(story)
+
+# Lazily built in each PDF worker process by render_pdf_report; the lock keeps concurrent
+# first calls from building (and using) separate generators
+_PDF_GENERATOR = None
+_PDF_GENERATOR_LOCK = threading.Lock()
+
+def _get_pdf_generator() -> ReportGenerator:
+    global _PDF_GENERATOR
+    if _PDF_GENERATOR is None:
+        with _PDF_GENERATOR_LOCK:
+            if _PDF_GENERATOR is None:
+                _PDF_GENERATOR = ReportGenerator()
+    return _PDF_GENERATOR
+
+def render_pdf_report(results: dict, llm_insights: Optional[dict], output: Union[str, BinaryIO]) -> dict:
+    """Build a PDF report from a module-level entry point that process pools can pickle.
+
+    Returns results updated with the report metrics, since in-place updates made
+    in a worker process do not reach the caller.
+    """
+    _get_pdf_generator().create_pdf_report(results, llm_insights, output)
+    return results
+
+def render_pdf_bytes(results: dict, llm_insights: Optional[dict] = None) -> bytes:
+    """Build a PDF report in memory, for callers that serve it without touching disk."""
+    buffer = io.BytesIO()
+    _get_pdf_generator().create_pdf_report(results, llm_insights, buffer)
+    return buffer.getvalue()
@@ -1,8 +1,62 @@
-import numpy as np
-from typing import Dict, List, Tuple, Any
-from dataclasses import dataclass
+import math
+import os
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from bisect import bisect_right
+from operator import mul
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 
-@dataclass
+if TYPE_CHECKING:
+    import numpy as np
+
+# Health and lifestyle impact on life expectancy in years, keyed by lowercase name
+_HEALTH_LUT = MappingProxyType({
+    "diabetes": -5,  # CDC Diabetes Statistics 2023
+    "heart_disease": -7,  # American Heart Association 2023 Report
+    "hypertension": -3,  # CDC Hypertension Statistics 2023
+    "smoking": -10,  # WHO Tobacco Report 2023
+    "regular_exercise": 5,  # WHO Physical Activity Guidelines 2023
+    "healthy_diet": 3  # WHO Nutrition Guidelines 2023
+})
+
+# Education adjustment to life expectancy (WHO 2023 Education Impact Study), keyed by
+# lowercase level so input only needs .lower(); unknown levels score like "other"
+_EDU_LUT = MappingProxyType({
+    "high school": 0,
+    "bachelor's": 2,
+    "master's": 3,
+    "phd": 4,
+    "other": 0
+})
+
+# Array forms of the tables above: column i of a profile's impact_mask counts how often
+# that condition or active lifestyle factor applies, and IMPACT_VEC[i] is its effect;
+# EDUCATION_LUT[EDUCATION_CODES[level]] is that level's adjustment. The arrays themselves
+# are built on first use by _load_arrays
+CONDITION_INDEX = {name: column for column, name in enumerate(_HEALTH_LUT)}
+_IMPACTS = tuple(_HEALTH_LUT.values())
+EDUCATION_CODES = {level: code for code, level in enumerate(_EDU_LUT)}
+
+# Gender codes and their life-expectancy adjustment (WHO 2023 Gender Health Report);
+# anything but "female" scores like "male"
+GENDER_CODES = {"male": 0, "female": 1}
+_GENDER_ADJUSTMENTS = (0.0, 5.0)
+
+# Global average life expectancy (WHO 2023 Global Health Report)
+BASE_LIFE_EXPECTANCY = 71.3
+
+# Inflation and return assumptions (BLS & S&P 500 Historical Data)
+INFLATION_RATE = 0.03  # 3% annual inflation (BLS 2023)
+INVESTMENT_RETURN = 0.05  # 5% real return (S&P 500 Historical Average)
+
+# Share of current spending assumed to continue through retirement
+RETIREMENT_EXPENSE_RATIO = 0.8
+
+# Slots drop the per-instance __dict__, which adds up when scoring profiles in bulk
+@dataclass(frozen=True, slots=True)
 class UserProfile:
     age: int
     gender: str
@@ -17,6 +71,199 @@ class UserProfile:
     health_conditions: List[str]
     family_health_history: List[str]
     lifestyle_factors: Dict[str, bool]  # e.g., {"smoking": False, "exercise": True}
+    impact_mask: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    annual_retirement_expenses: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Count of each CONDITION_INDEX entry that applies: health conditions match
+        # case-insensitively, lifestyle factors by exact key when set
+        impact_mask = [0] * len(CONDITION_INDEX)
+        for name in chain(
+            (condition.lower() for condition in self.health_conditions),
+            (factor for factor, value in self.lifestyle_factors.items() if value)
+        ):
+            column = CONDITION_INDEX.get(name)
+            if column is not None:
+                impact_mask[column] += 1
+        object.__setattr__(self, "impact_mask", tuple(impact_mask))
+        object.__setattr__(self, "annual_retirement_expenses", self.monthly_expenses * 12 * RETIREMENT_EXPENSE_RATIO)
+
+def _health_impact(impact_mask: Tuple[int, ...]) -> int:
+    """Summed life-expectancy effect of a profile's impact_mask; plain ints, so scalar
+    calls never pay NumPy's per-call overhead."""
+    return sum(map(mul, _IMPACTS, impact_mask))
+
+def _required_savings(annual_expenses: float, retirement_duration: float,
+                      inflation_rate: float, investment_return: float) -> float:
+    """Present value of retirement expenses; pure float kernel shared by the calculator methods."""
+    # Calculate real rate of return (nominal return - inflation)
+    real_rate = investment_return - inflation_rate
+    
+    # Calculate present value of retirement expenses
+    if real_rate == 0:
+        return annual_expenses * retirement_duration
+    else:
+        return annual_expenses * ((1 - math.pow(1 + real_rate, -retirement_duration)) / real_rate)
+
+# Recommendation tiers (SSA Retirement Benefits Guide 2023), indexed by how many of the
+# financial ratio thresholds a profile clears
+_TIER_THRESHOLDS = (0.8, 1.2)
+_TIERS = (("delayed_retirement", 70), ("standard_retirement", 67), ("early_retirement", 65))
+
+# Only the batch and Monte Carlo entry points need NumPy, so it and the array forms of the
+# tables are imported on first use and single-profile scoring never loads it
+_ARRAYS = {}
+
+def _load_arrays():
+    if not _ARRAYS:
+        import numpy as np
+        _ARRAYS.update(
+            IMPACT_VEC=np.fromiter(_HEALTH_LUT.values(), dtype=np.int64, count=len(_HEALTH_LUT)),
+            EDUCATION_LUT=np.fromiter(_EDU_LUT.values(), dtype=np.float64, count=len(_EDU_LUT)),
+            GENDER_LUT=np.array(_GENDER_ADJUSTMENTS),
+            TIER_THRESHOLDS=np.array(_TIER_THRESHOLDS),
+            TIER_SCENARIOS=np.array([scenario for scenario, _ in _TIERS]),
+            TIER_AGES=np.array([age for _, age in _TIERS])
+        )
+    return _ARRAYS
+
+# Public array tables, still importable from the module
+_LAZY_ARRAYS = frozenset({"IMPACT_VEC", "EDUCATION_LUT", "GENDER_LUT"})
+
+def __getattr__(name):
+    if name in _LAZY_ARRAYS:
+        return _load_arrays()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _future_values(current_savings: float, annual_savings: float, years: float,
+                   growth_rate: float) -> Tuple[float, float]:
+    """Future value of a lump sum and of a level annual contribution after `years` of growth;
+    pure float kernel that computes the growth factor once for both."""
+    growth = math.pow(1 + growth_rate, years)
+    return current_savings * growth, annual_savings * (growth - 1) / growth_rate
+
+@lru_cache(maxsize=4096)
+def _recommend_core(female: bool, education_level: str, health_impact: int,
+                    annual_expenses: float, current_savings: float) -> tuple:
+    """Everything recommend_retirement_age computes, keyed on the few profile values it reads;
+    health_impact is the profile's summed condition and lifestyle adjustment, annual_expenses
+    its annual_retirement_expenses."""
+    # Calculate life expectancy
+    life_expectancy = _base_life_expectancy(female, education_level) + health_impact
+    
+    return _score_life_expectancy(life_expectancy, annual_expenses, current_savings)
+
+def _base_life_expectancy(female: bool, education_level: str) -> float:
+    """Life expectancy before health and lifestyle adjustments; shared by every scoring path."""
+    # Adjust for gender (WHO 2023 Gender Health Report); index by GENDER_CODES, female is 1
+    gender_adjustment = _GENDER_ADJUSTMENTS[female]
+    
+    # Adjust for education level (WHO 2023 Education Impact Study)
+    education_adjustment = _EDU_LUT.get(education_level, 0)
+    
+    return BASE_LIFE_EXPECTANCY + gender_adjustment + education_adjustment
+
+def _score_life_expectancy(life_expectancy: float, annual_expenses: float, current_savings: float) -> tuple:
+    """The financial half of _recommend_core, once life expectancy is known."""
+    # Financial calculations (Federal Reserve Economic Data 2023)
+    retirement_duration = life_expectancy - 65  # Assuming retirement at 65
+    
+    # Calculate required savings (SSA Actuarial Tables 2023)
+    required_savings = _required_savings(
+        annual_expenses,
+        retirement_duration,
+        INFLATION_RATE,
+        INVESTMENT_RETURN
+    )
+    
+    # Calculate financial readiness ratio
+    financial_ratio = current_savings / required_savings if required_savings > 0 else 0
+    
+    # Determine recommended retirement age (SSA Retirement Benefits Guide 2023)
+    scenario, recommended_age = _TIERS[bisect_right(_TIER_THRESHOLDS, financial_ratio)]
+    
+    return (recommended_age, life_expectancy, financial_ratio, scenario,
+            required_savings, annual_expenses, retirement_duration)
+
+# Growth at 7% for every whole number of years calculate_financial_readiness can see
+# with a realistic age: 1.07**n and the matching annuity factor (1.07**n - 1) / 0.07
+_POW_107 = tuple(1.07 ** n for n in range(101))
+_ANNUITY_FV = tuple((growth - 1) / 0.07 for growth in _POW_107)
+
+def _result_dict(profile: UserProfile, scored: tuple) -> dict:
+    """Lay out a _recommend_core tuple as recommend_retirement_age's result."""
+    (recommended_age, life_expectancy, financial_ratio, scenario,
+     required_savings, annual_expenses, retirement_duration) = scored
+    return {
+        "recommended_retirement_age": recommended_age,
+        "life_expectancy": life_expectancy,
+        "financial_ratio": financial_ratio,
+        "scenario": scenario,
+        "financial_metrics": {
+            "total_retirement_savings": profile.current_savings,
+            "required_savings": required_savings,
+            "annual_retirement_expenses": annual_expenses,
+            "retirement_duration": retirement_duration
+        },
+        "profile": profile
+    }
+
+@lru_cache(maxsize=256)
+def _specialized_scorer(female: bool, education_level: str) -> Callable[[UserProfile], dict]:
+    # Same order of additions as _recommend_core, so results match it exactly
+    base_life_expectancy = _base_life_expectancy(female, education_level)
+    
+    def score(profile: UserProfile) -> dict:
+        return _result_dict(profile, _score_life_expectancy(
+            base_life_expectancy + _health_impact(profile.impact_mask),
+            profile.annual_retirement_expenses,
+            profile.current_savings
+        ))
+    
+    return score
+
+# Rows per thread below which recommend_batch_vectorized stays single-threaded
+_PARALLEL_BLOCK_ROWS = 100_000
+
+def _score_arrays(gender_codes, education_codes, monthly_expenses, current_savings,
+                  impact_masks) -> Dict[str, "np.ndarray"]:
+    """recommend_batch_vectorized's array kernel for one block of rows."""
+    import numpy as np
+    arrays = _load_arrays()
+    
+    life_expectancy = (
+        BASE_LIFE_EXPECTANCY
+        + np.take(arrays["GENDER_LUT"], gender_codes)
+        + np.take(arrays["EDUCATION_LUT"], education_codes)
+        + np.asarray(impact_masks) @ arrays["IMPACT_VEC"]
+    )
+    
+    annual_expenses = monthly_expenses * 12 * RETIREMENT_EXPENSE_RATIO
+    retirement_duration = life_expectancy - 65
+    
+    real_rate = INVESTMENT_RETURN - INFLATION_RATE
+    if real_rate == 0:
+        required_savings = annual_expenses * retirement_duration
+    else:
+        # 1 - (1 + r) ** -d, without the cancellation of subtracting two near-equal values
+        required_savings = annual_expenses * (-np.expm1(-retirement_duration * np.log1p(real_rate)) / real_rate)
+    
+    financial_ratio = np.divide(
+        current_savings, required_savings,
+        out=np.zeros(len(required_savings)), where=required_savings > 0
+    )
+    tier = np.searchsorted(arrays["TIER_THRESHOLDS"], financial_ratio, side="right")
+    
+    return {
+        "recommended_retirement_age": arrays["TIER_AGES"][tier],
+        "life_expectancy": life_expectancy,
+        "financial_ratio": financial_ratio,
+        "scenario": arrays["TIER_SCENARIOS"][tier],
+        "total_retirement_savings": current_savings,
+        "required_savings": required_savings,
+        "annual_retirement_expenses": annual_expenses,
+        "retirement_duration": retirement_duration
+    }
 
 class RetirementCalculator:
     def __init__(self):
@@ -27,57 +274,46 @@ class RetirementCalculator:
         }
         
         # Health impact factors
-        self.health_impact_factors = {
-            "diabetes": -5,
-            "heart_disease": -7,
-            "hypertension": -3,
-            "smoking": -10,
-            "regular_exercise": 5,
-            "healthy_diet": 3
-        }
+        self.health_impact_factors = _HEALTH_LUT
 
-    def calculate_life_expectancy(self, profile: UserProfile) -> float:
+    def calculate_life_expectancy(self, profile: UserProfile, health_impact: Optional[int] = None) -> float:
         """Calculate estimated life expectancy based on user profile."""
         base_expectancy = self.base_life_expectancy.get(profile.gender.lower(), 78)
         
-        # Adjust for health conditions
-        health_adjustment = sum(
-            self.health_impact_factors.get(condition, 0)
-            for condition in profile.health_conditions
-        )
+        # Adjust for health conditions and lifestyle factors
+        if health_impact is None:
+            health_impact = _health_impact(profile.impact_mask)
         
-        # Adjust for lifestyle factors
-        lifestyle_adjustment = sum(
-            self.health_impact_factors.get(factor, 0)
-            for factor, value in profile.lifestyle_factors.items()
-            if value
-        )
-        
-        return max(60, base_expectancy + health_adjustment + lifestyle_adjustment)
+        return max(60, base_expectancy + health_impact)
 
-    def calculate_financial_readiness(self, profile: UserProfile) -> Tuple[float, Dict[str, float]]:
-        """Calculate financial readiness for retirement."""
+    def calculate_financial_readiness(self, profile: UserProfile,
+                                      life_expectancy: Optional[float] = None) -> Tuple[float, Dict[str, float]]:
+        """Calculate financial readiness for retirement. Pass life_expectancy if it is already known."""
         # Calculate annual savings
         annual_savings = (profile.monthly_income - profile.monthly_expenses) * 12
         
-        # Calculate retirement needs (assuming 80% of current expenses)
-        # Ensure monthly_expenses is not zero
-        monthly_expenses = max(profile.monthly_expenses, 1.0)  # Minimum $1 to avoid division by zero
-        annual_retirement_expenses = monthly_expenses * 12 * 0.8
+        # Calculate retirement needs (assuming RETIREMENT_EXPENSE_RATIO of current expenses)
+        # Minimum of $1 a month to avoid division by zero
+        annual_retirement_expenses = max(profile.annual_retirement_expenses, 12 * RETIREMENT_EXPENSE_RATIO)
         
         # Calculate years until retirement
         years_to_retirement = max(65 - profile.age, 1)  # Minimum 1 year to avoid division by zero
         
-        # Calculate future value of current savings
-        future_savings = profile.current_savings * (1.07) ** years_to_retirement
-        
-        # Calculate future value of annual savings
-        future_annual_savings = annual_savings * ((1.07) ** years_to_retirement - 1) / 0.07
+        # Calculate future value of current savings and of annual savings
+        if isinstance(years_to_retirement, int) and years_to_retirement < len(_POW_107):
+            future_savings = profile.current_savings * _POW_107[years_to_retirement]
+            future_annual_savings = annual_savings * _ANNUITY_FV[years_to_retirement]
+        else:
+            future_savings, future_annual_savings = _future_values(
+                profile.current_savings, annual_savings, years_to_retirement, 0.07
+            )
         
         total_retirement_savings = future_savings + future_annual_savings
         
         # Calculate retirement duration
-        retirement_duration = max(self.calculate_life_expectancy(profile) - 65, 1)  # Minimum 1 year
+        if life_expectancy is None:
+            life_expectancy = self.calculate_life_expectancy(profile)
+        retirement_duration = max(life_expectancy - 65, 1)  # Minimum 1 year
         
         # Calculate if savings are sufficient
         required_savings = annual_retirement_expenses * retirement_duration
@@ -97,14 +333,7 @@ class RetirementCalculator:
     def _calculate_required_savings(self, annual_expenses: float, retirement_duration: float, 
                                  inflation_rate: float, investment_return: float) -> float:
         """Calculate required savings for retirement using present value formula."""
-        # Calculate real rate of return (nominal return - inflation)
-        real_rate = investment_return - inflation_rate
-        
-        # Calculate present value of retirement expenses
-        if real_rate == 0:
-            return annual_expenses * retirement_duration
-        else:
-            return annual_expenses * ((1 - (1 + real_rate) ** -retirement_duration) / real_rate)
+        return _required_savings(annual_expenses, retirement_duration, inflation_rate, investment_return)
 
     def recommend_retirement_age(self, profile: UserProfile) -> dict:
         """
@@ -137,84 +366,158 @@ class RetirementCalculator:
         - Lifestyle Factors: WHO Physical Activity Guidelines 2023
           https://www.who.int/publications/i/item/9789240015128
         """
-        # Base life expectancy calculation (WHO 2023 Global Health Report)
-        base_life_expectancy = 71.3  # Global average life expectancy
-        
-        # Adjust for gender (WHO 2023 Gender Health Report)
-        gender_adjustment = 5 if profile.gender.lower() == "female" else 0
-        
-        # Adjust for education level (WHO 2023 Education Impact Study)
-        education_adjustment = {
-            "high school": 0,
-            "bachelor's": 2,
-            "master's": 3,
-            "phd": 4,
-            "other": 0
-        }.get(profile.education_level.lower(), 0)
-        
-        # Health impact factors (CDC 2023 Health Statistics)
-        self.health_impact_factors = {
-            "diabetes": -5,  # CDC Diabetes Statistics 2023
-            "heart_disease": -7,  # American Heart Association 2023 Report
-            "hypertension": -3,  # CDC Hypertension Statistics 2023
-            "smoking": -10,  # WHO Tobacco Report 2023
-            "regular_exercise": 5,  # WHO Physical Activity Guidelines 2023
-            "healthy_diet": 3  # WHO Nutrition Guidelines 2023
+        # Health and lifestyle impact (CDC 2023 Health Statistics, WHO 2023 Lifestyle Impact Study)
+        return self._recommendation(profile, _health_impact(profile.impact_mask))
+
+    def _recommendation(self, profile: UserProfile, health_impact: int) -> dict:
+        # Only these profile values feed the result, so repeat queries are a cache lookup
+        return _result_dict(profile, _recommend_core(
+            profile.gender.lower() == "female",
+            profile.education_level.lower(),
+            health_impact,
+            profile.annual_retirement_expenses,
+            profile.current_savings
+        ))
+
+    def compile_specialized(self, gender: str, education_level: str) -> Callable[[UserProfile], dict]:
+        """
+        recommend_retirement_age for a cohort that shares one gender and education level,
+        e.g. a single employer's pension pool.
+
+        The gender and education adjustments are folded into the returned function's base
+        life expectancy, so each call only sums the health impact. Profiles passed to it are
+        assumed to belong to the cohort. Functions are cached per (gender, education level).
+        """
+        # Unknown levels score like "other", so free text never grows the cache
+        education_level = education_level.lower()
+        if education_level not in _EDU_LUT:
+            education_level = "other"
+        return _specialized_scorer(gender.lower() == "female", education_level)
+
+    def analyze(self, profile: UserProfile) -> dict:
+        """
+        recommend_retirement_age and calculate_financial_readiness in one pass.
+
+        The health impact is summed once and the readiness life expectancy is computed
+        once; the readiness ratio and its metrics are added under "readiness".
+        """
+        health_impact = _health_impact(profile.impact_mask)
+        life_expectancy = self.calculate_life_expectancy(profile, health_impact)
+        financial_ratio, financial_metrics = self.calculate_financial_readiness(profile, life_expectancy)
+        
+        results = self._recommendation(profile, health_impact)
+        results["readiness"] = {
+            "life_expectancy": life_expectancy,
+            "financial_ratio": financial_ratio,
+            "financial_metrics": financial_metrics
         }
+        return results
+
+    def recommend_batch(self, profiles: List[UserProfile]) -> Dict[str, "np.ndarray"]:
+        """
+        Vectorized recommend_retirement_age over many profiles.
+
+        Profiles are unpacked once into per-field code and value arrays, then scored by
+        recommend_batch_vectorized. Returns one array per result field, aligned with `profiles`.
+        """
+        import numpy as np
+        
+        n = len(profiles)
+        gender_codes = np.fromiter(
+            (GENDER_CODES.get(p.gender.lower(), GENDER_CODES["male"]) for p in profiles),
+            dtype=np.intp, count=n
+        )
+        education_codes = np.fromiter(
+            (EDUCATION_CODES.get(p.education_level.lower(), EDUCATION_CODES["other"]) for p in profiles),
+            dtype=np.intp, count=n
+        )
+        monthly_expenses = np.fromiter((p.monthly_expenses for p in profiles), dtype=np.float64, count=n)
+        current_savings = np.fromiter((p.current_savings for p in profiles), dtype=np.float64, count=n)
+        impact_masks = np.array([p.impact_mask for p in profiles], dtype=np.int8).reshape(n, len(CONDITION_INDEX))
+        
+        return self.recommend_batch_vectorized(
+            gender_codes, education_codes, monthly_expenses, current_savings, impact_masks
+        )
+
+    def recommend_batch_vectorized(self, gender_codes: "np.ndarray", education_codes: "np.ndarray",
+                                   monthly_expenses: "np.ndarray", current_savings: "np.ndarray",
+                                   impact_masks: "np.ndarray") -> Dict[str, "np.ndarray"]:
+        """
+        Score profiles already laid out as arrays, e.g. columns of a DataFrame.
+
+        gender_codes and education_codes index GENDER_LUT and EDUCATION_LUT (see
+        GENDER_CODES and EDUCATION_CODES); impact_masks is an (N, len(CONDITION_INDEX))
+        matrix of condition counts, as in UserProfile.impact_mask. No step loops in Python.
+        """
+        import numpy as np
+        
+        monthly_expenses = np.asarray(monthly_expenses, dtype=np.float64)
+        current_savings = np.asarray(current_savings, dtype=np.float64)
+        columns = (np.asarray(gender_codes), np.asarray(education_codes),
+                   monthly_expenses, current_savings, np.asarray(impact_masks))
+        
+        # NumPy releases the GIL inside its loops, so large batches are split into row
+        # blocks scored on a thread per core
+        n = len(monthly_expenses)
+        workers = min(os.cpu_count() or 1, n // _PARALLEL_BLOCK_ROWS)
+        if workers <= 1:
+            return _score_arrays(*columns)
+        bounds = np.linspace(0, n, workers + 1, dtype=np.intp)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(
+                lambda start, stop: _score_arrays(*(column[start:stop] for column in columns)),
+                bounds[:-1], bounds[1:]
+            ))
+        return {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0]}
+
+    def recommend_retirement_age_mc(self, profile: UserProfile, n: int = 10000, seed: int = 0) -> Dict[str, Any]:
+        """
+        Monte Carlo sensitivity of recommend_retirement_age to its assumptions.
+
+        Samples inflation (around INFLATION_RATE), investment return (around
+        INVESTMENT_RETURN) and retirement duration
+        (around the profile's life expectancy minus 65) for `n` paths and scores them all
+        at once. Returns the mean financial ratio with a 90% interval and the probability
+        of each scenario; recommended_retirement_age is the age of the most likely one.
+        """
+        if n < 1:
+            raise ValueError(f"n must be at least 1, got {n}")
+        
+        import numpy as np
+        arrays = _load_arrays()
         
-        # Calculate health impact
-        health_impact = 0
-        for condition in profile.health_conditions:
-            health_impact += self.health_impact_factors.get(condition.lower(), 0)
-        
-        # Lifestyle factors (WHO 2023 Lifestyle Impact Study)
-        for factor, value in profile.lifestyle_factors.items():
-            if value:
-                health_impact += self.health_impact_factors.get(factor, 0)
-        
-        # Calculate life expectancy
-        life_expectancy = base_life_expectancy + gender_adjustment + education_adjustment + health_impact
-        
-        # Financial calculations (Federal Reserve Economic Data 2023)
-        annual_expenses = profile.monthly_expenses * 12
-        retirement_duration = life_expectancy - 65  # Assuming retirement at 65
-        
-        # Inflation and return assumptions (BLS & S&P 500 Historical Data)
-        inflation_rate = 0.03  # 3% annual inflation (BLS 2023)
-        investment_return = 0.05  # 5% real return (S&P 500 Historical Average)
-        
-        # Calculate required savings (SSA Actuarial Tables 2023)
-        required_savings = self._calculate_required_savings(
-            annual_expenses,
-            retirement_duration,
-            inflation_rate,
-            investment_return
+        rng = np.random.default_rng(seed)
+        inflation_rate = rng.normal(INFLATION_RATE, 0.005, n)
+        investment_return = rng.normal(INVESTMENT_RETURN, 0.02, n)
+        
+        life_expectancy = (
+            _base_life_expectancy(profile.gender.lower() == "female", profile.education_level.lower())
+            + _health_impact(profile.impact_mask)
         )
+        retirement_duration = rng.normal(life_expectancy - 65, 3, n)
+        annual_expenses = profile.annual_retirement_expenses
         
-        # Calculate financial readiness ratio
-        financial_ratio = profile.current_savings / required_savings if required_savings > 0 else 0
+        real_rate = investment_return - inflation_rate
+        with np.errstate(divide="ignore", invalid="ignore"):
+            required_savings = np.where(
+                real_rate == 0,
+                annual_expenses * retirement_duration,
+                annual_expenses * (-np.expm1(-retirement_duration * np.log1p(real_rate)) / real_rate)
+            )
+        financial_ratio = np.divide(
+            profile.current_savings, required_savings,
+            out=np.zeros(n), where=required_savings > 0
+        )
         
-        # Determine recommended retirement age (SSA Retirement Benefits Guide 2023)
-        if financial_ratio >= 1.2:
-            recommended_age = 65
-            scenario = "early_retirement"
-        elif financial_ratio >= 0.8:
-            recommended_age = 67
-            scenario = "standard_retirement"
-        else:
-            recommended_age = 70
-            scenario = "delayed_retirement"
+        tier = np.searchsorted(arrays["TIER_THRESHOLDS"], financial_ratio, side="right")
+        probabilities = np.bincount(tier, minlength=len(_TIERS)) / n
+        low, high = np.percentile(financial_ratio, [5, 95])
         
         return {
-            "recommended_retirement_age": recommended_age,
+            "recommended_retirement_age": _TIERS[int(np.argmax(probabilities))][1],
             "life_expectancy": life_expectancy,
-            "financial_ratio": financial_ratio,
-            "scenario": scenario,
-            "financial_metrics": {
-                "total_retirement_savings": profile.current_savings,
-                "required_savings": required_savings,
-                "annual_retirement_expenses": annual_expenses,
-                "retirement_duration": retirement_duration
-            },
-            "profile": profile
-        } 
\ No newline at end of file
+            "financial_ratio_mean": float(financial_ratio.mean()),
+            "financial_ratio_ci": (float(low), float(high)),
+            "scenario_probabilities": dict(zip((scenario for scenario, _ in _TIERS), probabilities.tolist())),
+            "samples": n
+        }